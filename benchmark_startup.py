@@ -0,0 +1,67 @@
+import os
+import os.path
+import sys
+import time
+import argparse
+import subprocess
+import statistics
+import tempfile
+from kv_storage_commands import KVStorage
+
+
+SCRIPT_NAME = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                           'KV-Storage.py')
+
+
+def measure_process(command, count_of_runs):
+    times = []
+    for _ in range(count_of_runs):
+        start = time.perf_counter()
+        subprocess.run(command, stdout=subprocess.DEVNULL, check=True)
+        times.append(time.perf_counter() - start)
+    return statistics.median(times)
+
+
+def measure_in_process_get(data_file_name, count_of_runs):
+    times = []
+    kv = KVStorage(data_file_name)
+    for _ in range(count_of_runs):
+        start = time.perf_counter()
+        kv.get('key')
+        times.append(time.perf_counter() - start)
+    kv.close()
+    return statistics.median(times)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Benchmark of cold start of KV-Storage command line '
+                    'interface. Medians of running of single get command '
+                    'are compared with start of bare interpreter')
+    parser.add_argument('-n', '--runs', type=int, default=20,
+                        help='count of runs of every measurement')
+    args = parser.parse_args()
+    with tempfile.TemporaryDirectory() as directory:
+        data_file_name = os.path.join(directory, 'benchmark.kv')
+        kv = KVStorage(data_file_name)
+        kv.init()
+        kv.add('key', 'value')
+        kv.close()
+        interpreter = measure_process([sys.executable, '-c', 'pass'],
+                                      args.runs)
+        help_output = measure_process([sys.executable, SCRIPT_NAME],
+                                      args.runs)
+        get = measure_process(
+            [sys.executable, SCRIPT_NAME, 'get', data_file_name, 'key'],
+            args.runs)
+        in_process_get = measure_in_process_get(data_file_name, args.runs)
+    print(f'interpreter start: {interpreter * 1000:.1f} ms')
+    print(f'help output: {help_output * 1000:.1f} ms')
+    print(f'get command: {get * 1000:.1f} ms')
+    print(f'get command without interpreter start: '
+          f'{(get - interpreter) * 1000:.1f} ms')
+    print(f'get in process: {in_process_get * 1000:.3f} ms')
+
+
+if __name__ == '__main__':
+    main()
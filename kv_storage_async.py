@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from kv_storage_commands import KVStorage
+
+
+class AsyncKVStorage:
+    DEFAULT_COUNT_OF_READERS = 4
+    KEYS_PER_STEP = 256
+
+    def __init__(self, data_file_name, readers=DEFAULT_COUNT_OF_READERS,
+                 allocation=KVStorage.ALLOCATION_PADDING, dedup=False,
+                 expire_interval=None):
+        if readers < 1:
+            raise ValueError(f'Count of readers must be positive: {readers}')
+        self._data_file_name = data_file_name
+        self._allocation = allocation
+        self._dedup = dedup
+        self._readers = ThreadPoolExecutor(max_workers=readers)
+        self._writer = ThreadPoolExecutor(max_workers=1)
+        self._local = threading.local()
+        self._storages = []
+        self._storages_lock = threading.Lock()
+        self._queue = None
+        self._writer_task = None
+        self._expire_interval = expire_interval
+        self._expiring_task = None
+        self._expire_error = None
+        self._is_closed = False
+
+    async def __aenter__(self):
+        self._start_expiring()
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.close()
+
+    async def close(self):
+        if self._is_closed:
+            return
+        self._is_closed = True
+        if self._expiring_task is not None:
+            self._expiring_task.cancel()
+            try:
+                await self._expiring_task
+            except asyncio.CancelledError:
+                pass
+        if self._writer_task is not None:
+            await self._queue.join()
+            self._writer_task.cancel()
+            try:
+                await self._writer_task
+            except asyncio.CancelledError:
+                pass
+        await asyncio.get_running_loop().run_in_executor(
+            None, self._close_storages)
+
+    async def add(self, key, value, ttl=None):
+        return await self._write('add', key, value, ttl)
+
+    async def add_file(self, key, path_to_file, dedup=None, ttl=None):
+        return await self._write('add_file', key, path_to_file, dedup, ttl)
+
+    async def get(self, key):
+        return await self._read('get', key)
+
+    async def get_file(self, key, path_to_inp_file):
+        return await self._read('get_file', key, path_to_inp_file)
+
+    async def contains(self, key):
+        return await self._read('contains', key)
+
+    async def erase(self, key):
+        return await self._write('erase', key)
+
+    async def change(self, key, value_type, value, dedup=None, ttl=None):
+        return await self._write('change', key, value_type, value, dedup,
+                                 ttl)
+
+    async def expire(self):
+        return await self._write('expire')
+
+    async def get_all_keys(self):
+        return await self._read('get_all_keys')
+
+    async def iter_keys(self):
+        keys = await self.get_all_keys()
+        for i, key in enumerate(keys):
+            if i != 0 and i % self.KEYS_PER_STEP == 0:
+                await asyncio.sleep(0)
+            yield key
+
+    async def _read(self, method_name, *args):
+        if self._is_closed:
+            raise RuntimeError('AsyncKVStorage is closed')
+        self._raise_expire_error()
+        self._start_expiring()
+        return await asyncio.get_running_loop().run_in_executor(
+            self._readers, self._call, KVStorage.MODE_READ, method_name, args)
+
+    async def _write(self, method_name, *args):
+        if self._is_closed:
+            raise RuntimeError('AsyncKVStorage is closed')
+        self._raise_expire_error()
+        self._start_expiring()
+        loop = asyncio.get_running_loop()
+        if self._writer_task is None:
+            self._queue = asyncio.Queue()
+            self._writer_task = loop.create_task(self._process_writes())
+        result = loop.create_future()
+        await self._queue.put((method_name, args, result))
+        return await result
+
+    def _start_expiring(self):
+        if self._expire_interval is not None and self._expiring_task is None:
+            self._expiring_task = asyncio.get_running_loop().create_task(
+                self._expire_periodically())
+
+    async def _expire_periodically(self):
+        while True:
+            await asyncio.sleep(self._expire_interval)
+            try:
+                await self.expire()
+            except Exception as e:
+                self._expire_error = e
+                return
+
+    def _raise_expire_error(self):
+        if self._expire_error is None:
+            return
+        error = self._expire_error
+        self._expire_error = None
+        self._expiring_task = None
+        raise error
+
+    async def _process_writes(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            method_name, args, result = await self._queue.get()
+            try:
+                value = await loop.run_in_executor(
+                    self._writer, self._call, KVStorage.MODE_WRITE,
+                    method_name, args)
+            except Exception as e:
+                if not result.done():
+                    result.set_exception(e)
+            else:
+                if not result.done():
+                    result.set_result(value)
+            finally:
+                self._queue.task_done()
+
+    def _call(self, mode, method_name, args):
+        return getattr(self._get_storage(mode), method_name)(*args)
+
+    def _get_storage(self, mode):
+        storage = getattr(self._local, 'storage', None)
+        if storage is None:
+            storage = KVStorage(self._data_file_name, self._allocation,
+                                self._dedup, mode)
+            with self._storages_lock:
+                self._storages.append(storage)
+            self._local.storage = storage
+        return storage
+
+    def _close_storages(self):
+        self._readers.shutdown(wait=True)
+        self._writer.shutdown(wait=True)
+        with self._storages_lock:
+            for storage in self._storages:
+                storage.close()
+            self._storages.clear()
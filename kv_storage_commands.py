@@ -5,8 +5,14 @@ import os.path
 import struct
 import re
 from collections import namedtuple
-import csv
+from contextlib import contextmanager
+import functools
 import sys
+import time
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
 
 
 class InvalidCsvFileError(Exception):
@@ -84,11 +90,99 @@ class NoSuchKeyError(Exception):
         return self.message
 
 
+class InvalidBackupFileError(Exception):
+    def __init__(self, file):
+        self.message = f'File {file} is not backup file'
+
+    def __str__(self):
+        return self.message
+
+
+class IncompatibleBackupError(Exception):
+    def __init__(self, file, since_generation, generation):
+        self.message = (f'Backup {file} contains changes since generation '
+                        f'{since_generation}, but data file has generation '
+                        f'{generation}')
+
+    def __str__(self):
+        return self.message
+
+
+class NotIntegerValueError(Exception):
+    def __init__(self, file, key):
+        self.message = (f'Value of item with the key {key} '
+                        f'in data file {file} is not integer')
+
+    def __str__(self):
+        return self.message
+
+
+class IntegerOverflowError(Exception):
+    def __init__(self, value):
+        self.message = (f'The value {value} is out of range '
+                        f'of integers in KV-Storage')
+
+    def __str__(self):
+        return self.message
+
+
+class InvalidChangeStreamError(Exception):
+    def __init__(self, file):
+        self.message = f'File {file} is not change stream of data file'
+
+    def __str__(self):
+        return self.message
+
+
+class ReadOnlyStorageError(Exception):
+    def __init__(self, file):
+        self.message = f'Data file {file} is opened only for reading'
+
+    def __str__(self):
+        return self.message
+
+
+class RejectedItemsError(Exception):
+    def __init__(self, file, count_of_imported, count_of_rejected):
+        self.message = (f'{count_of_imported} items were imported from '
+                        f'{file}, {count_of_rejected} items were rejected')
+
+    def __str__(self):
+        return self.message
+
+
 Cell = namedtuple('Cell',
                   ['cell_len', 'key_type_len', 'key_type',
                    'key_len', 'key',
                    'value_type_len', 'value_type',
-                   'value_len', 'value'])
+                   'value_len', 'value', 'generation', 'expires_at'])
+
+TypeAndValue = namedtuple('result', ['type', 'correct_value'])
+
+CorruptedCell = namedtuple('CorruptedCell', ['tree_ind', 'link', 'problem'])
+
+VerificationReport = namedtuple('VerificationReport',
+                                ['count_of_cells', 'is_header_corrupted',
+                                 'corrupted_cells', 'corrupted_tree_heights',
+                                 'count_of_restored_cells'])
+
+
+def _locked(exclusive):
+    def decorator(method):
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            if exclusive and self._mode == self.MODE_READ:
+                raise ReadOnlyStorageError(self._data_file_name)
+            with self._lock(exclusive):
+                try:
+                    return method(self, *args, **kwargs)
+                except Exception:
+                    self._is_validated = False
+                    if exclusive:
+                        self._validated_generation = None
+                    raise
+        return wrapper
+    return decorator
 
 
 class KVStorage:
@@ -100,15 +194,67 @@ class KVStorage:
     MAX_TREE_IND = 2 ** 18 - 2
     MAX_TREE_HEIGHT = 17
     LINKS_START = 4
+    GENERATION_POSITION = FULL_CAPACITY - 4
+    CELL_METADATA_FORMAT = '>lq'
+    BACKUP_SIGNATURE = b'KVSB'
+    FICLONE = 0x40049409
+    CHECKSUM_MODULE = 1000000007
+    FORMAT_JSONL = 'jsonl'
+    FORMAT_CSV = 'csv'
+    IMPORT_BATCH_SIZE = 1048576
+    ALLOCATION_EXACT = 'exact'
+    ALLOCATION_PADDING = 'padding'
+    ALLOCATION_POW2 = 'pow2'
+    CELL_PADDING = 0.25
+    MIN_INT = -2 ** 31
+    MAX_INT = 2 ** 31 - 1
+    BLOB_SIGNATURE = b'BLOB'
+    BLOB_HEADER_FORMAT = '>l4s32s'
     TYPE_DATA = 'data'
     TYPE_FILE = 'file'
-
-    def __init__(self, data_file_name):
+    TYPE_BLOB = 'blob'
+    CHANGES_SUFFIX = '.changes'
+    BLOB_INDEX_SUFFIX = '.blobs'
+    BLOB_INDEX_SIGNATURE = b'KVSB'
+    BLOB_INDEX_RECORD_FORMAT = '>l32s'
+    APPLIED_POSITION_SUFFIX = '.applied'
+    CHANGES_SIGNATURE = b'KVSC'
+    CHANGE_RECORD_FORMAT = '>lll'
+    CHANGE_PUT = 1
+    CHANGE_ERASE = 2
+    CHANGE_CLEAR = 3
+    CHANGE_EXPIRE = 4
+    MODE_READ = 'r'
+    MODE_WRITE = 'w'
+    QUOTED_INTEGER_PATTERNS = (re.compile(r'(\'+)\d+\1'),
+                               re.compile(r'(\"+)\d+\1'))
+    CSV_INTEGER_PATTERN = re.compile(r'-?[0-9]+')
+
+    def __init__(self, data_file_name, allocation=ALLOCATION_PADDING,
+                 dedup=False, mode=MODE_WRITE):
+        if allocation not in (self.ALLOCATION_EXACT, self.ALLOCATION_PADDING,
+                              self.ALLOCATION_POW2):
+            raise ValueError(f'Unknown allocation {allocation}')
+        if mode not in (self.MODE_READ, self.MODE_WRITE):
+            raise ValueError(f'Unknown mode {mode}')
         self._data_file_name = data_file_name
+        self._allocation = allocation
+        self._dedup = dedup
+        self._mode = mode
+        self._lock_depth = 0
+        self._is_validated = False
+        self._validated_generation = None
+        if mode == self.MODE_READ:
+            if not self._is_file_existing(data_file_name):
+                raise FileFailureError(data_file_name)
+            self._file = open(self._data_file_name, 'rb')
+            self._data_file = self._map_file()
+            return
         if not self._is_file_existing(data_file_name):
             f = open(self._data_file_name, 'wb')
             f.close()
-        self._data_file = open(self._data_file_name, 'r+b')
+        self._file = open(self._data_file_name, 'r+b')
+        self._data_file = self._file
 
     def __enter__(self):
         return self
@@ -118,10 +264,48 @@ class KVStorage:
 
     def close(self):
         self._data_file.close()
+        self._file.close()
+
+    def lock(self, exclusive=True):
+        if exclusive and self._mode == self.MODE_READ:
+            raise ReadOnlyStorageError(self._data_file_name)
+        return self._lock(exclusive)
+
+    def _map_file(self):
+        import mmap
 
+        if os.fstat(self._file.fileno()).st_size != self.FULL_CAPACITY:
+            self._file.close()
+            raise NotDataFileError(self._data_file_name)
+        return mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+
+    @contextmanager
+    def _lock(self, exclusive):
+        if self._lock_depth == 0:
+            if fcntl is not None:
+                fcntl.flock(self._file.fileno(),
+                            fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+            self._data_file.flush()
+        self._lock_depth += 1
+        try:
+            yield
+        finally:
+            self._lock_depth -= 1
+            if self._lock_depth == 0:
+                if self._is_validated:
+                    self._validated_generation = self._get_generation()
+                self._is_validated = False
+                self._data_file.flush()
+                if fcntl is not None:
+                    fcntl.flock(self._file.fileno(), fcntl.LOCK_UN)
+
+    @_locked(exclusive=True)
     def init(self):
         if not self._is_file_existing(self._data_file_name):
             raise FileFailureError(self._data_file_name)
+        generation = 0
+        if os.path.getsize(self._data_file_name) == self.FULL_CAPACITY:
+            generation = max(self._get_generation(), 0) + 1
         self._data_file.seek(0)
         self._data_file.write(
             struct.pack('>l', self.CHECKSUMS_AND_DATA_BOUNDARY))
@@ -129,57 +313,59 @@ class KVStorage:
             self._data_file.write(struct.pack('>l', 0))
         for i in range((self.FULL_CAPACITY - 4) % 4):
             self._data_file.write(b'0')
+        self._drop_blob_index()
+        self._set_generation(generation)
+        self._record_changes([(self.CHANGE_CLEAR, generation, b'')])
 
-    def add(self, key, value):
+    @_locked(exclusive=True)
+    def add(self, key, value, ttl=None):
         self._is_it_valid_data_file()
-        old_key, old_value = key, value
         type_of_key, key = self._get_type_and_correct_value(key)
         type_of_value, value = self._get_type_and_correct_value(value)
-        if self._find_position_of_link_of_key(old_key)[0]:
+        expires_at = self._get_expiration_time(ttl)
+        is_in_storage = self._find_position_of_link(key)
+        if is_in_storage[0] and not self._is_expired(is_in_storage[2]):
             raise UsedKeyError(key)
-        cell = self._create_cell_of_data(type_of_key, key,
-                                         type_of_value, value)
-        self._add_data(cell)
+        cell = self._set_expiration_of_cell(
+            self._create_cell_of_data(type_of_key, key, type_of_value, value),
+            expires_at)
+        if is_in_storage[0]:
+            self._replace_cell(is_in_storage[1], cell)
+        else:
+            self._add_data(cell)
 
-    def add_file(self, key, path_to_file):
+    @_locked(exclusive=True)
+    def add_file(self, key, path_to_file, dedup=None, ttl=None):
         self._is_it_valid_data_file()
-        old_key = key
         type_of_key, key = self._get_type_and_correct_value(key)
-        type_of_value = 'file'
         if not self._is_file_existing(path_to_file):
             raise FileFailureError(path_to_file)
-        if self._find_position_of_link_of_key(old_key)[0]:
+        expires_at = self._get_expiration_time(ttl)
+        is_in_storage = self._find_position_of_link(key)
+        if is_in_storage[0] and not self._is_expired(is_in_storage[2]):
             raise UsedKeyError(key)
         if (os.path.getsize(path_to_file) > self.FULL_CAPACITY -
                 self.CHECKSUMS_AND_DATA_BOUNDARY):
             raise BigDataError()
-        data_from_file = self._read_file(path_to_file)
-        cell = self._create_cell_of_file(type_of_key, key,
-                                         type_of_value, data_from_file)
-        self._add_data(cell)
+        cell, blob = self._create_cell_of_file_content(
+            type_of_key, key, self._read_file(path_to_file), dedup)
+        cell = self._set_expiration_of_cell(cell, expires_at)
+        if is_in_storage[0]:
+            self._replace_cell(is_in_storage[1], cell, blob)
+        else:
+            self._add_data(cell, blob)
 
+    @_locked(exclusive=False)
     def get(self, key):
-        self._is_it_valid_data_file()
-        old_key = key
-        key = self._get_type_and_correct_value(key).correct_value
-        is_in_storage = self._find_position_of_link_of_key(old_key)
-        if not is_in_storage[0]:
-            raise NoSuchKeyError(self._data_file_name, key)
-        position_of_link = is_in_storage[1]
-        self._data_file.seek(position_of_link)
-        link = struct.unpack('>l', self._data_file.read(4))[0]
-        self._data_file.seek(link, 0)
-        cell_size = struct.unpack('>l', self._data_file.read(4))[0]
-        self._data_file.seek(link, 0)
-        cell = self._data_file.read(cell_size)
-        value = self._parse_cell(cell).value
+        value = self._get_value(key)
         if type(value) is bytes:
             value = value.decode('utf-8')
         return value
 
+    @_locked(exclusive=False)
     def get_file(self, key, path_to_inp_file):
         old_key = key
-        value = self.get(old_key)
+        value = self._get_value(old_key)
         if hasattr(value, 'encode'):
             value = value.encode()
         if isinstance(value, int):
@@ -187,13 +373,33 @@ class KVStorage:
         with open(path_to_inp_file, 'wb') as inp_file:
             inp_file.write(value)
 
+    def _get_value(self, key):
+        self._is_it_valid_data_file()
+        old_key = key
+        key = self._get_type_and_correct_value(key).correct_value
+        is_in_storage = self._find_position_of_link_of_key(old_key)
+        if not is_in_storage[0]:
+            raise NoSuchKeyError(self._data_file_name, key)
+        return self._get_content_of_cell(is_in_storage[2])
+
+    @_locked(exclusive=False)
     def contains(self, key):
         old_key = key
         self._is_it_valid_data_file()
         is_in_storage = self._find_position_of_link_of_key(old_key)
         return is_in_storage[0]
 
+    @_locked(exclusive=True)
     def erase(self, key):
+        self._is_it_valid_data_file()
+        old_key = key
+        key = self._get_type_and_correct_value(key).correct_value
+        is_in_storage = self._find_position_of_link_of_key(old_key)
+        if not is_in_storage[0]:
+            raise NoSuchKeyError(self._data_file_name, key)
+        self._erase_by_position_of_link(is_in_storage[1])
+
+    def _erase_by_position_of_link(self, position_of_link):
         def find_next_tree_ind(direction):
             nonlocal cur_tree_ind, self, cur_link_position
             opp_dir = 3 - direction
@@ -229,20 +435,17 @@ class KVStorage:
             cur_tree_ind = last_tree_ind
             return 1
 
-        self._is_it_valid_data_file()
-        old_key = key
-        key = self._get_type_and_correct_value(key).correct_value
-        is_in_storage = self._find_position_of_link_of_key(old_key)
-        if not is_in_storage[0]:
-            raise NoSuchKeyError(self._data_file_name, key)
-        position_of_link = is_in_storage[1]
+        self._data_file.seek(position_of_link)
+        link = struct.unpack('>l', self._data_file.read(4))[0]
+        erased_cell = self._read_cell(link)
         cur_tree_ind = (position_of_link - 4) // 4
 
         while True:
             if cur_tree_ind > self.MAX_TREE_IND:
                 break
             cur_tree_height = self._calc_tree_ind_height(cur_tree_ind)
-            if self._is_checksum_changed(cur_tree_height):
+            if (not self._is_validated and
+                    self._is_checksum_changed(cur_tree_height)):
                 raise NotDataFileError(self._data_file_name)
             cur_link_position = self.LINKS_START + 4 * cur_tree_ind
             self._data_file.seek(cur_link_position)
@@ -267,9 +470,13 @@ class KVStorage:
                 continue
             break
         self._update_checksums_in_file()
+        self._record_changes([(self.CHANGE_ERASE, self._increase_generation(),
+                               erased_cell)])
 
+    @_locked(exclusive=True)
     def clear(self):
         self._is_it_valid_data_file()
+        generation = self._get_generation()
         self._data_file.seek(0)
         self._data_file.write(
             struct.pack('>l', self.CHECKSUMS_AND_DATA_BOUNDARY))
@@ -277,57 +484,200 @@ class KVStorage:
             self._data_file.write(struct.pack('>l', 0))
         for i in range((self.FULL_CAPACITY - 4) % 4):
             self._data_file.write(b'0')
+        self._drop_blob_index()
+        self._set_generation(generation + 1)
+        self._record_changes([(self.CHANGE_CLEAR, generation + 1, b'')])
 
-    def change(self, key, value_type, value):
+    @_locked(exclusive=True)
+    def expire(self):
+        self._is_it_valid_data_file()
+        return self._expire(int(time.time() * 1000))
+
+    def _expire(self, now):
+        live_cells = []
+        expired_cells = []
+        for link in self._read_links():
+            if link == 0:
+                continue
+            cell = self._read_cell(link)
+            parsed_cell = self._parse_cell(cell)
+            if self._is_expired(parsed_cell, now):
+                expired_cells.append(cell)
+            else:
+                live_cells.append(parsed_cell)
+        if len(expired_cells) == 0:
+            return 0
+        live_cells.sort(key=functools.cmp_to_key(
+            lambda a, b: self._compare_keys(b.key, a.key)))
+        blob_links = set()
+        for parsed_cell in live_cells:
+            if parsed_cell.value_type == self.TYPE_BLOB:
+                blob_links.add(struct.unpack('>l', parsed_cell.value[0:4])[0])
+        data = bytearray()
+        new_blob_links = {}
+        header_len = struct.calcsize(self.BLOB_HEADER_FORMAT)
+        for blob_link in blob_links:
+            new_blob_links[blob_link] = (self.CHECKSUMS_AND_DATA_BOUNDARY +
+                                         len(data))
+            content = self._read_blob(blob_link)
+            self._data_file.seek(blob_link)
+            data += self._data_file.read(header_len) + content
+        links = [0] * (self.MAX_TREE_IND + 1)
+        keys = {}
+        for cell_ind in self._iter_in_balanced_order(len(live_cells)):
+            parsed_cell = live_cells[cell_ind]
+            if parsed_cell.value_type == self.TYPE_BLOB:
+                blob_link, content_hash = struct.unpack('>l32s',
+                                                        parsed_cell.value)
+                cell = self._create_cell_of_file(
+                    parsed_cell.key_type, parsed_cell.key, self.TYPE_BLOB,
+                    struct.pack('>l32s', new_blob_links[blob_link],
+                                content_hash))
+            else:
+                cell = self._recreate_cell(parsed_cell)
+            cell = self._set_generation_of_cell(
+                self._set_expiration_of_cell(cell, parsed_cell.expires_at),
+                parsed_cell.generation)
+            link = self.CHECKSUMS_AND_DATA_BOUNDARY + len(data)
+            if link + len(cell) > self.GENERATION_POSITION:
+                raise LackOfMemoryError(self._data_file_name)
+            data += self._pad_cell(
+                cell, self._get_capacity_of_cell(len(cell), link))
+            tree_ind = 0
+            while links[tree_ind] != 0:
+                if self._compare_keys(parsed_cell.key, keys[tree_ind]) == 1:
+                    tree_ind = tree_ind * 2 + 1
+                else:
+                    tree_ind = tree_ind * 2 + 2
+            links[tree_ind] = link
+            keys[tree_ind] = parsed_cell.key
+        self._data_file.seek(self.CHECKSUMS_AND_DATA_BOUNDARY)
+        self._data_file.write(data)
+        self._data_file.seek(0)
+        self._data_file.write(struct.pack(
+            '>l', self.CHECKSUMS_AND_DATA_BOUNDARY + len(data))[0:4])
+        self._data_file.write(struct.pack(f'>{len(links)}l', *links))
+        self._update_checksums_in_file()
+        self._drop_blob_index()
+        generation = self._increase_generation()
+        self._record_changes([(self.CHANGE_EXPIRE, generation,
+                               struct.pack('>q', now))])
+        return len(expired_cells)
+
+    @_locked(exclusive=True)
+    def change(self, key, value_type, value, dedup=None, ttl=None):
         self._is_it_valid_data_file()
-        old_key, old_value = key, value
         key_type, key = self._get_type_and_correct_value(key)
         if value_type == self.TYPE_DATA:
             value_type, value = self._get_type_and_correct_value(value)
-        link_position = self._find_position_of_link_of_key(old_key)
+        link_position = self._find_position_of_live_link(key)
         if not link_position[0]:
             raise NoSuchKeyError(self._data_file_name, key)
+        expires_at = link_position[2].expires_at
+        if ttl is not None:
+            expires_at = self._get_expiration_time(ttl)
         if value_type == self.TYPE_FILE:
-            current_cell = self._create_cell_of_file(key_type, key,
-                                                     'file', value)
+            if not self._is_file_existing(value):
+                raise FileFailureError(value)
+            current_cell, blob = self._create_cell_of_file_content(
+                key_type, key, self._read_file(value), dedup)
         else:
             current_cell = self._create_cell_of_data(key_type, key,
                                                      value_type, value)
-        link_position = link_position[1]
-        self._data_file.seek(link_position)
-        link = struct.unpack('>l', self._data_file.read(4))[0]
-        self._data_file.seek(link)
-        prev_cell_size = struct.unpack('>l', self._data_file.read(4))[0]
-        current_cell_size = len(current_cell)
-        if current_cell_size <= prev_cell_size:
-            self._data_file.seek(link)
-            self._data_file.write(current_cell[0:current_cell_size])
-            self._update_checksums_in_file()
-        else:
-            self.erase(old_key)
-            self.add(old_key, old_value)
+            blob = b''
+        self._replace_cell(link_position[1], self._set_expiration_of_cell(
+            current_cell, expires_at), blob)
 
+    @_locked(exclusive=True)
+    def incr(self, key, delta=1):
+        self._is_it_valid_data_file()
+        key_type, key = self._get_type_and_correct_value(key)
+        link_position, parsed_cell = self._find_cell_of_key(key)
+        if parsed_cell.value_type != 'int':
+            raise NotIntegerValueError(self._data_file_name, key)
+        value = parsed_cell.value + int(delta)
+        if not self.MIN_INT <= value <= self.MAX_INT:
+            raise IntegerOverflowError(value)
+        self._replace_cell(link_position, self._set_expiration_of_cell(
+            self._create_cell_of_data(key_type, key, 'int', value),
+            parsed_cell.expires_at))
+        return value
+
+    @_locked(exclusive=True)
+    def cas(self, key, expected_value, new_value):
+        self._is_it_valid_data_file()
+        key_type, key = self._get_type_and_correct_value(key)
+        expected_value = self._get_type_and_correct_value(expected_value)
+        new_value_type, new_value = self._get_type_and_correct_value(
+            new_value)
+        link_position, parsed_cell = self._find_cell_of_key(key)
+        if (parsed_cell.value_type != expected_value.type or
+                parsed_cell.value != expected_value.correct_value):
+            return False
+        self._replace_cell(link_position, self._set_expiration_of_cell(
+            self._create_cell_of_data(key_type, key, new_value_type,
+                                      new_value),
+            parsed_cell.expires_at))
+        return True
+
+    @_locked(exclusive=False)
     def check_validity_of_file(self):
+        if not self._is_valid_structure():
+            return False
         try:
-            self._data_file.seek(0)
-            last_link = struct.unpack('>l', self._data_file.read(4))[0]
-            if last_link < self.CHECKSUMS_AND_DATA_BOUNDARY:
-                return False
-            for i in range((self.LINKS_AND_CHECKSUMS_BOUNDARY - 4) // 4):
-                link = struct.unpack('>l', self._data_file.read(4))[0]
-                if (link != 0 and
-                    link != self.ERASED_ELEMENT_NUMBER and
-                    (link < self.CHECKSUMS_AND_DATA_BOUNDARY or
-                     link >= self.FULL_CAPACITY)):
-                    return False
-            for i in range(self.MAX_TREE_HEIGHT):
-                if self._is_checksum_changed(i):
-                    return False
+            self._check_blobs()
         except Exception:
             return False
         return True
 
+    @_locked(exclusive=False)
+    def verify(self, path_to_repaired_file=None, jobs=None):
+        from concurrent.futures import ProcessPoolExecutor
+        from itertools import repeat
+
+        if (path_to_repaired_file is not None and
+                self._is_file_existing(path_to_repaired_file)):
+            raise DataFileExistenceError(path_to_repaired_file)
+        if os.path.getsize(self._data_file_name) != self.FULL_CAPACITY:
+            raise NotDataFileError(self._data_file_name)
+        self._data_file.seek(0)
+        free_place = struct.unpack('>l', self._data_file.read(4))[0]
+        is_header_corrupted = not (self.CHECKSUMS_AND_DATA_BOUNDARY <=
+                                   free_place <= self.GENERATION_POSITION)
+        if is_header_corrupted:
+            free_place = self.GENERATION_POSITION
+        jobs = jobs or os.cpu_count() or 1
+        count_of_links = self.MAX_TREE_IND + 1
+        bounds = [count_of_links * i // jobs for i in range(jobs + 1)]
+        count_of_cells = 0
+        corrupted_cells = []
+        checksums = [0] * (self.MAX_TREE_HEIGHT + 1)
+        with ProcessPoolExecutor(max_workers=jobs) as executor:
+            for part in executor.map(_verify_part_of_links,
+                                     repeat(self._data_file_name),
+                                     bounds[:-1], bounds[1:],
+                                     repeat(free_place)):
+                count_of_cells += part[0]
+                corrupted_cells += part[1]
+                for i in range(self.MAX_TREE_HEIGHT + 1):
+                    checksums[i] ^= part[2][i]
+        corrupted_tree_heights = []
+        for i in range(self.MAX_TREE_HEIGHT + 1):
+            self._data_file.seek(self.LINKS_AND_CHECKSUMS_BOUNDARY + 4 * i)
+            prev_checksum = struct.unpack('>l', self._data_file.read(4))[0]
+            if prev_checksum != checksums[i] % self.CHECKSUM_MODULE:
+                corrupted_tree_heights.append(i)
+        count_of_restored_cells = None
+        if path_to_repaired_file is not None:
+            count_of_restored_cells = self._repair(path_to_repaired_file,
+                                                   free_place)
+        return VerificationReport(count_of_cells, is_header_corrupted,
+                                  corrupted_cells, corrupted_tree_heights,
+                                  count_of_restored_cells)
+
+    @_locked(exclusive=True)
     def add_package(self, error_handling_func=None, csv_file=None):
+        import csv
 
         def handle_row(cur_row):
             try:
@@ -366,6 +716,7 @@ class KVStorage:
                 handle_row(row)
                 row_ind += 1
 
+    @_locked(exclusive=False)
     def get_all_keys(self):
         self._is_it_valid_data_file()
         keys = []
@@ -404,12 +755,983 @@ class KVStorage:
                 self._data_file.seek(cur_link)
                 cell_size = struct.unpack('>l', self._data_file.read(4))[0]
                 self._data_file.seek(cur_link)
-                keys.append(
-                    self._parse_cell(self._data_file.read(cell_size)).key)
+                parsed_cell = self._parse_cell(
+                    self._data_file.read(cell_size))
+                if not self._is_expired(parsed_cell):
+                    keys.append(parsed_cell.key)
         return keys
 
+    @_locked(exclusive=False)
+    def export_items(self, path_to_output_file, file_format=None):
+        import base64
+        import csv
+        import json
+
+        self._is_it_valid_data_file()
+        file_format = self._get_items_file_format(path_to_output_file,
+                                                  file_format)
+        count_of_items = 0
+        with open(path_to_output_file, 'w', newline='') as output_file:
+            csv_writer = csv.writer(output_file)
+            for link in self._iter_links_in_key_order(self._read_links()):
+                parsed_cell = self._parse_cell(self._read_cell(link))
+                if self._is_expired(parsed_cell):
+                    continue
+                value = self._get_content_of_cell(parsed_cell)
+                item_type = self.TYPE_DATA
+                if parsed_cell.value_type in (self.TYPE_FILE, self.TYPE_BLOB):
+                    value = base64.b64encode(value).decode()
+                    item_type = self.TYPE_FILE
+                if file_format == self.FORMAT_CSV:
+                    if item_type == self.TYPE_DATA:
+                        value = self._convert_to_query(value)
+                    csv_writer.writerow(
+                        [item_type,
+                         self._convert_to_query(parsed_cell.key), value])
+                else:
+                    output_file.write(json.dumps(
+                        {'type': item_type, 'key': parsed_cell.key,
+                         'value': value}) + '\n')
+                count_of_items += 1
+        return count_of_items
+
+    @_locked(exclusive=True)
+    def import_items(self, path_to_input_file, file_format=None,
+                     error_handling_func=None):
+        self._is_it_valid_data_file()
+        if not self._is_file_existing(path_to_input_file):
+            raise FileFailureError(path_to_input_file)
+        file_format = self._get_items_file_format(path_to_input_file,
+                                                  file_format)
+        with open(path_to_input_file, 'rb') as input_file:
+            offsets_of_items = self._read_offsets_of_items(input_file,
+                                                           file_format)
+            items = ((row_ind,
+                      self._read_item(input_file, offsets_of_items[row_ind],
+                                      file_format))
+                     for row_ind in self._iter_in_balanced_order(
+                         len(offsets_of_items)))
+            return self._insert_cells(
+                items, lambda item: self._create_cell_of_item(item,
+                                                              file_format),
+                error_handling_func)
+
+    def _insert_cells(self, items, create_cell, error_handling_func=None,
+                      keep_generations=False, reject_errors=False):
+        def find_free_tree_ind(key):
+            cur_tree_ind = 0
+            while cur_tree_ind <= self.MAX_TREE_IND:
+                if links[cur_tree_ind] == 0:
+                    return cur_tree_ind
+                if cur_tree_ind not in keys:
+                    keys[cur_tree_ind] = self._parse_cell(
+                        self._read_cell(links[cur_tree_ind])).key
+                compare_result = self._compare_keys(key, keys[cur_tree_ind])
+                if compare_result == 0:
+                    raise UsedKeyError(key)
+                if compare_result == 1:
+                    cur_tree_ind = cur_tree_ind * 2 + 1
+                else:
+                    cur_tree_ind = cur_tree_ind * 2 + 2
+            raise FullDataFileError(self._data_file_name)
+
+        def write_batch():
+            nonlocal batch_start
+            self._data_file.seek(batch_start)
+            self._data_file.write(batch)
+            batch_start += len(batch)
+            batch.clear()
+
+        links = list(self._read_links())
+        keys = {}
+        self._data_file.seek(0)
+        batch_start = struct.unpack('>l', self._data_file.read(4))[0]
+        batch = bytearray()
+        generation = self._get_generation() + 1
+        inserted_links = []
+        for row_ind, item in items:
+            try:
+                cell = create_cell(item)
+                if not keep_generations:
+                    cell = self._set_generation_of_cell(cell, generation)
+                parsed_cell = self._parse_cell(cell)
+                key = parsed_cell.key
+                tree_ind = find_free_tree_ind(key)
+                link = batch_start + len(batch)
+                if link + len(cell) > self.GENERATION_POSITION:
+                    raise LackOfMemoryError(self._data_file_name)
+                batch += self._pad_cell(
+                    cell, self._get_capacity_of_cell(len(cell), link))
+                links[tree_ind] = link
+                keys[tree_ind] = key
+                inserted_links.append((parsed_cell.generation, link))
+                if len(batch) >= self.IMPORT_BATCH_SIZE:
+                    write_batch()
+            except Exception:
+                if reject_errors:
+                    raise
+                if callable(error_handling_func):
+                    error_handling_func(row_ind, item)
+        write_batch()
+        self._data_file.seek(0)
+        self._data_file.write(struct.pack('>l', batch_start)[0:4])
+        self._data_file.write(struct.pack(f'>{len(links)}l', *links))
+        self._update_checksums_in_file()
+        if not keep_generations:
+            self._set_generation(generation)
+        self._record_changes((self.CHANGE_PUT, cell_generation,
+                              self._read_cell(link))
+                             for cell_generation, link in inserted_links)
+        return len(inserted_links)
+
+    @_locked(exclusive=False)
+    def stats(self, path_to_primary=None):
+        self._is_it_valid_data_file()
+        self._data_file.seek(0)
+        free_place = struct.unpack('>l', self._data_file.read(4))[0]
+        count_of_items = 0
+        count_of_expired_items = 0
+        references_of_blobs = {}
+        for link in self._read_links():
+            if link == 0:
+                continue
+            parsed_cell = self._parse_cell(self._read_cell(link))
+            if self._is_expired(parsed_cell):
+                count_of_expired_items += 1
+            else:
+                count_of_items += 1
+            if parsed_cell.value_type == self.TYPE_BLOB:
+                blob_link = struct.unpack('>l', parsed_cell.value[0:4])[0]
+                references_of_blobs[blob_link] = (
+                    references_of_blobs.get(blob_link, 0) + 1)
+        deduplicated_bytes = 0
+        for blob_link, count_of_references in references_of_blobs.items():
+            self._data_file.seek(blob_link)
+            blob_len = struct.unpack('>l', self._data_file.read(4))[0]
+            content_len = blob_len - struct.calcsize(self.BLOB_HEADER_FORMAT)
+            deduplicated_bytes += (count_of_references - 1) * content_len
+        statistics = {
+            'generation': self._get_generation(),
+            'count_of_items': count_of_items,
+            'count_of_expired_items': count_of_expired_items,
+            'used_bytes': free_place - self.CHECKSUMS_AND_DATA_BOUNDARY,
+            'free_bytes': self.GENERATION_POSITION - free_place,
+            'count_of_blobs': len(references_of_blobs),
+            'count_of_blob_references': sum(references_of_blobs.values()),
+            'deduplicated_bytes': deduplicated_bytes
+        }
+        path_to_changes = self._data_file_name + self.CHANGES_SUFFIX
+        if self._is_file_existing(path_to_changes):
+            statistics['change_stream_position'] = os.path.getsize(
+                path_to_changes)
+        if (path_to_primary is not None or self._is_file_existing(
+                self._data_file_name + self.APPLIED_POSITION_SUFFIX)):
+            statistics['applied_position'] = self._get_applied_position()
+        if path_to_primary is not None:
+            path_to_changes = path_to_primary + self.CHANGES_SUFFIX
+            with self._open_changes(path_to_changes) as changes_file:
+                statistics['lag_changes'] = sum(
+                    1 for change in self._iter_changes(changes_file,
+                                                       path_to_changes))
+                statistics['lag_bytes'] = (
+                    changes_file.seek(0, os.SEEK_END) -
+                    max(statistics['applied_position'],
+                        len(self.CHANGES_SIGNATURE)))
+        return statistics
+
+    @_locked(exclusive=True)
+    def enable_replication(self):
+        self._is_it_valid_data_file()
+        path_to_changes = self._data_file_name + self.CHANGES_SUFFIX
+        if self._is_file_existing(path_to_changes):
+            return path_to_changes
+        with open(path_to_changes, 'wb') as changes_file:
+            changes_file.write(self.CHANGES_SIGNATURE)
+        generation = self._get_generation()
+        changes = [(self.CHANGE_CLEAR, generation, b'')]
+        for link in self._read_links():
+            if link != 0:
+                changes.append((self.CHANGE_PUT, generation,
+                                self._read_cell(link)))
+        self._record_changes(changes)
+        return path_to_changes
+
+    @_locked(exclusive=True)
+    def follow(self, path_to_primary):
+        self._is_it_valid_data_file()
+        path_to_changes = path_to_primary + self.CHANGES_SUFFIX
+        count_of_changes = 0
+        put_changes = []
+        with self._open_changes(path_to_changes) as changes_file:
+            for position, operation, generation, payload in (
+                    self._iter_changes(changes_file, path_to_changes)):
+                if len(put_changes) != 0 and operation != self.CHANGE_PUT:
+                    self._apply_put_changes(put_changes)
+                    put_changes = []
+                if operation == self.CHANGE_PUT:
+                    put_changes.append((generation, payload))
+                else:
+                    self._apply_change(operation, generation, payload,
+                                       path_to_changes)
+                count_of_changes += 1
+            if len(put_changes) != 0:
+                self._apply_put_changes(put_changes)
+            if count_of_changes != 0:
+                self._set_applied_position(position)
+        return count_of_changes
+
+    @_locked(exclusive=False)
+    def snapshot(self, path_to_snapshot):
+        self._is_it_valid_data_file()
+        if self._is_file_existing(path_to_snapshot):
+            raise DataFileExistenceError(path_to_snapshot)
+        with open(path_to_snapshot, 'wb') as snapshot_file:
+            self._copy_data_file(snapshot_file)
+
+    @_locked(exclusive=False)
+    def backup(self, path_to_backup, since_generation=None):
+        self._is_it_valid_data_file()
+        generation = self._get_generation()
+        packed_keys = []
+        changed_links = []
+        for link in self._read_links():
+            if link == 0:
+                continue
+            parsed_cell = self._parse_cell(self._read_cell(link))
+            if self._is_expired(parsed_cell):
+                continue
+            packed_keys.append(self._pack_key(parsed_cell.key_type,
+                                              parsed_cell.key))
+            if (since_generation is None or
+                    parsed_cell.generation > since_generation):
+                changed_links.append(link)
+        with open(path_to_backup, 'wb') as backup_file:
+            backup_file.write(struct.pack(
+                '>4sll', self.BACKUP_SIGNATURE,
+                -1 if since_generation is None else since_generation,
+                generation))
+            backup_file.write(struct.pack('>l', len(packed_keys)))
+            for packed_key in packed_keys:
+                backup_file.write(struct.pack(f'>l{len(packed_key)}s',
+                                              len(packed_key), packed_key))
+            backup_file.write(struct.pack('>l', len(changed_links)))
+            for link in changed_links:
+                cell = self._read_cell(link)
+                parsed_cell = self._parse_cell(cell)
+                if parsed_cell.value_type == self.TYPE_BLOB:
+                    cell = self._set_generation_of_cell(
+                        self._recreate_cell(parsed_cell),
+                        parsed_cell.generation)
+                backup_file.write(cell)
+        return generation
+
+    @_locked(exclusive=True)
+    def restore(self, path_to_backup):
+        self._is_it_valid_data_file()
+        if not self._is_file_existing(path_to_backup):
+            raise FileFailureError(path_to_backup)
+        since_generation, generation, keys_in_backup, backup_cells = (
+            self._read_backup(path_to_backup))
+        if (since_generation != -1 and
+                since_generation != self._get_generation()):
+            raise IncompatibleBackupError(path_to_backup, since_generation,
+                                          self._get_generation())
+        restored_cells = {}
+        for key, cell in backup_cells:
+            restored_cells[key] = cell
+        for key in keys_in_backup:
+            if key in restored_cells:
+                continue
+            is_in_storage = self._find_position_of_live_link(key)
+            if not is_in_storage[0]:
+                raise IncompatibleBackupError(
+                    path_to_backup, since_generation, self._get_generation())
+            restored_cells[key] = self._set_generation_of_cell(
+                self._recreate_cell(is_in_storage[2]),
+                is_in_storage[2].generation)
+        restored_cells = sorted(restored_cells.items(),
+                                key=functools.cmp_to_key(
+                                    lambda a, b: self._compare_keys(b[0],
+                                                                    a[0])))
+        order = list(self._iter_in_balanced_order(len(restored_cells)))
+        link = self.CHECKSUMS_AND_DATA_BOUNDARY
+        for cell_ind in order:
+            cell = restored_cells[cell_ind][1]
+            if link + len(cell) > self.GENERATION_POSITION:
+                raise LackOfMemoryError(self._data_file_name)
+            link += self._get_capacity_of_cell(len(cell), link)
+        self._data_file.seek(0)
+        self._data_file.write(
+            struct.pack('>l', self.CHECKSUMS_AND_DATA_BOUNDARY))
+        self._data_file.write(bytes(4 * (self.MAX_TREE_IND + 1)))
+        self._drop_blob_index()
+        self._record_changes([(self.CHANGE_CLEAR, generation, b'')])
+        self._insert_cells(((row_ind, restored_cells[cell_ind][1])
+                            for row_ind, cell_ind in enumerate(order)),
+                           lambda cell: cell, keep_generations=True,
+                           reject_errors=True)
+        self._set_generation(generation)
+
+    def _read_backup(self, path_to_backup):
+        with open(path_to_backup, 'rb') as backup_file:
+            data = backup_file.read()
+        try:
+            signature, since_generation, generation = struct.unpack_from(
+                '>4sll', data, 0)
+            if signature != self.BACKUP_SIGNATURE:
+                raise InvalidBackupFileError(path_to_backup)
+            offset = 12
+            keys_in_backup = set()
+            count_of_keys = struct.unpack_from('>l', data, offset)[0]
+            offset += 4
+            for i in range(count_of_keys):
+                key_len = struct.unpack_from('>l', data, offset)[0]
+                offset += 4
+                if key_len < 0 or offset + key_len > len(data):
+                    raise InvalidBackupFileError(path_to_backup)
+                keys_in_backup.add(
+                    self._parse_key(data[offset:offset + key_len], 0)[3])
+                offset += key_len
+            backup_cells = []
+            count_of_cells = struct.unpack_from('>l', data, offset)[0]
+            offset += 4
+            for i in range(count_of_cells):
+                cell_size = struct.unpack_from('>l', data, offset)[0]
+                if cell_size < 4 or offset + cell_size > len(data):
+                    raise InvalidBackupFileError(path_to_backup)
+                parsed_cell = self._parse_cell(
+                    data[offset:offset + cell_size])
+                offset += cell_size
+                if (parsed_cell.value_type == self.TYPE_BLOB or
+                        parsed_cell.key not in keys_in_backup):
+                    raise InvalidBackupFileError(path_to_backup)
+                backup_cells.append((
+                    parsed_cell.key, self._set_generation_of_cell(
+                        self._recreate_cell(parsed_cell),
+                        parsed_cell.generation)))
+        except (struct.error, UnicodeDecodeError):
+            raise InvalidBackupFileError(path_to_backup)
+        if offset != len(data):
+            raise InvalidBackupFileError(path_to_backup)
+        return since_generation, generation, keys_in_backup, backup_cells
+
+    def _verify_links(self, st, fn, free_place):
+        count_of_cells = 0
+        corrupted_cells = []
+        checksums = [0] * (self.MAX_TREE_HEIGHT + 1)
+        self._data_file.seek(self.LINKS_START + 4 * st)
+        links = struct.unpack(f'>{fn - st}l',
+                              self._data_file.read(4 * (fn - st)))
+        for tree_ind, link in enumerate(links, st):
+            if link == 0:
+                continue
+            count_of_cells += 1
+            problem, cell = self._find_problem_of_slot(tree_ind, link,
+                                                       free_place)
+            if cell is not None:
+                checksums[self._calc_tree_ind_height(tree_ind)] ^= (
+                    self._convert_bytes_to_sum_of_integers(cell))
+            if problem is not None:
+                corrupted_cells.append(CorruptedCell(tree_ind, link, problem))
+        return count_of_cells, corrupted_cells, checksums
+
+    def _find_problem_of_slot(self, tree_ind, link, free_place):
+        import hashlib
+
+        if not (self.CHECKSUMS_AND_DATA_BOUNDARY <= link <
+                self.GENERATION_POSITION):
+            return 'link points outside of data region', None
+        self._data_file.seek(link)
+        cell_size = struct.unpack('>l', self._data_file.read(4))[0]
+        if cell_size < 4 or link + cell_size > self.GENERATION_POSITION:
+            return 'size of cell is wrong', None
+        self._data_file.seek(link)
+        cell = self._data_file.read(cell_size)
+        if link >= free_place:
+            return 'cell is out of used part of data region', cell
+        try:
+            parsed_cell = self._parse_cell(cell)
+            key = parsed_cell.key
+        except Exception:
+            return 'cell can\'t be parsed', cell
+        if parsed_cell.value_type == self.TYPE_BLOB:
+            try:
+                blob_link, content_hash = struct.unpack('>l32s',
+                                                        parsed_cell.value)
+                content = self._read_blob(blob_link)
+            except Exception:
+                return 'blob is corrupted or can\'t be read', cell
+            if hashlib.sha256(content).digest() != content_hash:
+                return 'blob doesn\'t match hash of cell', cell
+        if tree_ind == 0:
+            return None, cell
+        parent_tree_ind = (tree_ind - 1) // 2
+        self._data_file.seek(self.LINKS_START + 4 * parent_tree_ind)
+        parent_link = struct.unpack('>l', self._data_file.read(4))[0]
+        if parent_link == 0:
+            return 'tree slot has no parent', cell
+        try:
+            parent_key = self._parse_cell(self._read_cell(parent_link)).key
+        except Exception:
+            return None, cell
+        is_left_child = tree_ind % 2 == 1
+        if is_left_child != (self._compare_keys(key, parent_key) == 1):
+            return 'key is in wrong place of tree', cell
+        return None, cell
+
+    def _repair(self, path_to_repaired_file, free_place):
+        readable_cells = []
+        for tree_ind, link in enumerate(self._read_links()):
+            if link == 0:
+                continue
+            cell = self._find_problem_of_slot(tree_ind, link, free_place)[1]
+            try:
+                readable_cells.append((self._parse_cell(cell).key, link))
+            except Exception:
+                continue
+        readable_cells.sort(key=functools.cmp_to_key(
+            lambda a, b: self._compare_keys(b[0], a[0])))
+        items = ((row_ind, readable_cells[row_ind][1])
+                 for row_ind in self._iter_in_balanced_order(
+                     len(readable_cells)))
+        with KVStorage(path_to_repaired_file,
+                       self._allocation) as repaired_storage:
+            repaired_storage.init()
+            with repaired_storage._lock(exclusive=True):
+                return repaired_storage._insert_cells(
+                    items, lambda link: self._recreate_cell(
+                        self._parse_cell(self._read_cell(link))))
+
+    def _find_cell_of_key(self, key):
+        is_in_storage = self._find_position_of_live_link(key)
+        if not is_in_storage[0]:
+            raise NoSuchKeyError(self._data_file_name, key)
+        return is_in_storage[1], is_in_storage[2]
+
+    def _get_items_file_format(self, path_to_file, file_format):
+        if file_format is not None:
+            return file_format
+        if path_to_file.endswith('.csv'):
+            return self.FORMAT_CSV
+        return self.FORMAT_JSONL
+
+    def _read_offsets_of_items(self, input_file, file_format):
+        import csv
+
+        def read_lines():
+            nonlocal item_start
+            offset = 0
+            for line in input_file:
+                if item_start is None:
+                    item_start = offset
+                offset += len(line)
+                yield line.decode()
+
+        offsets_of_items = []
+        item_start = None
+        if file_format == self.FORMAT_CSV:
+            for row in csv.reader(read_lines()):
+                offsets_of_items.append(item_start)
+                item_start = None
+        else:
+            for line in read_lines():
+                if line.strip():
+                    offsets_of_items.append(item_start)
+                item_start = None
+        return offsets_of_items
+
+    def _read_item(self, input_file, offset, file_format):
+        import csv
+
+        input_file.seek(offset)
+        if file_format == self.FORMAT_CSV:
+            return next(csv.reader(line.decode() for line in input_file))
+        return input_file.readline().decode()
+
+    def _iter_in_balanced_order(self, count):
+        from collections import deque
+
+        queue = deque([(0, count)])
+        while len(queue) != 0:
+            st, fn = queue.popleft()
+            if st >= fn:
+                continue
+            middle = (st + fn) // 2
+            yield middle
+            queue.append((st, middle))
+            queue.append((middle + 1, fn))
+
+    def _convert_to_query(self, value):
+        import json
+
+        if isinstance(value, str) and (
+                self.CSV_INTEGER_PATTERN.fullmatch(value) is not None or
+                value.startswith('"')):
+            return json.dumps(value, ensure_ascii=False)
+        return value
+
+    def _convert_from_query(self, field):
+        import json
+
+        if self.CSV_INTEGER_PATTERN.fullmatch(field) is not None:
+            return TypeAndValue('int', int(field))
+        if field.startswith('"'):
+            try:
+                value = json.loads(field)
+            except ValueError:
+                value = None
+            if isinstance(value, str):
+                return TypeAndValue('string', value)
+        return TypeAndValue('string', field)
+
+    def _create_cell_of_item(self, item, file_format):
+        import base64
+        import json
+
+        if file_format == self.FORMAT_CSV:
+            item_type, key, value = item
+            key_type, key = self._convert_from_query(key)
+        else:
+            item = json.loads(item)
+            item_type, key, value = item['type'], item['key'], item['value']
+            key_type = 'int' if isinstance(key, int) else 'string'
+        if item_type == self.TYPE_FILE:
+            return self._create_cell_of_file(key_type, key, self.TYPE_FILE,
+                                             base64.b64decode(value))
+        if item_type != self.TYPE_DATA:
+            raise ValueError(item_type)
+        if file_format == self.FORMAT_CSV:
+            value_type, value = self._convert_from_query(value)
+        else:
+            value_type = 'int' if isinstance(value, int) else 'string'
+        return self._create_cell_of_data(key_type, key, value_type, value)
+
+    def _iter_links_in_key_order(self, links):
+        stack = []
+        cur_tree_ind = 0
+        while True:
+            while (cur_tree_ind <= self.MAX_TREE_IND and
+                   links[cur_tree_ind] != 0):
+                stack.append(cur_tree_ind)
+                cur_tree_ind = cur_tree_ind * 2 + 1
+            if len(stack) == 0:
+                return
+            cur_tree_ind = stack.pop()
+            yield links[cur_tree_ind]
+            cur_tree_ind = cur_tree_ind * 2 + 2
+
+    def _copy_data_file(self, output_file):
+        import shutil
+
+        self._data_file.flush()
+        data_file_descriptor = self._file.fileno()
+        output_file_descriptor = output_file.fileno()
+        if fcntl is not None:
+            try:
+                fcntl.ioctl(output_file_descriptor, self.FICLONE,
+                            data_file_descriptor)
+                return
+            except OSError:
+                pass
+        size = os.fstat(data_file_descriptor).st_size
+        if hasattr(os, 'copy_file_range'):
+            offset = 0
+            try:
+                while offset < size:
+                    copied = os.copy_file_range(
+                        data_file_descriptor, output_file_descriptor,
+                        size - offset, offset, offset)
+                    if copied == 0:
+                        break
+                    offset += copied
+            except OSError:
+                pass
+            if offset == size:
+                return
+        self._data_file.seek(0)
+        output_file.seek(0)
+        output_file.truncate()
+        shutil.copyfileobj(self._data_file, output_file)
+
+    def _get_generation(self):
+        self._data_file.seek(self.GENERATION_POSITION)
+        return struct.unpack('>l', self._data_file.read(4))[0]
+
+    def _set_generation(self, generation):
+        self._data_file.seek(self.GENERATION_POSITION)
+        self._data_file.write(struct.pack('>l', generation)[0:4])
+        path_to_blob_index = self._data_file_name + self.BLOB_INDEX_SUFFIX
+        if self._is_file_existing(path_to_blob_index):
+            with open(path_to_blob_index, 'r+b') as blob_index_file:
+                blob_index_file.seek(len(self.BLOB_INDEX_SIGNATURE))
+                blob_index_file.write(struct.pack('>l', generation))
+
+    def _increase_generation(self):
+        generation = self._get_generation() + 1
+        self._set_generation(generation)
+        return generation
+
+    def _set_generation_of_cell(self, cell, generation):
+        metadata_len = struct.calcsize(self.CELL_METADATA_FORMAT)
+        expires_at = struct.unpack(self.CELL_METADATA_FORMAT,
+                                   cell[-metadata_len:])[1]
+        return (cell[:-metadata_len] +
+                struct.pack(self.CELL_METADATA_FORMAT, generation,
+                            expires_at))
+
+    def _set_expiration_of_cell(self, cell, expires_at):
+        metadata_len = struct.calcsize(self.CELL_METADATA_FORMAT)
+        generation = struct.unpack(self.CELL_METADATA_FORMAT,
+                                   cell[-metadata_len:])[0]
+        return (cell[:-metadata_len] +
+                struct.pack(self.CELL_METADATA_FORMAT, generation,
+                            expires_at))
+
+    def _get_expiration_time(self, ttl):
+        if ttl is None:
+            return 0
+        if float(ttl) <= 0:
+            raise ValueError(f'TTL must be positive: {ttl}')
+        return int((time.time() + float(ttl)) * 1000)
+
+    def _is_expired(self, parsed_cell, now=None):
+        if now is None:
+            now = time.time() * 1000
+        return parsed_cell.expires_at != 0 and parsed_cell.expires_at <= now
+
+    def _read_links(self):
+        count_of_links = self.MAX_TREE_IND + 1
+        self._data_file.seek(self.LINKS_START)
+        return struct.unpack(f'>{count_of_links}l',
+                             self._data_file.read(4 * count_of_links))
+
+    def _read_cell(self, link):
+        self._data_file.seek(link)
+        cell_size = struct.unpack('>l', self._data_file.read(4))[0]
+        self._data_file.seek(link)
+        return self._data_file.read(cell_size)
+
+    def _recreate_cell(self, parsed_cell):
+        if parsed_cell.value_type in (self.TYPE_FILE, self.TYPE_BLOB):
+            cell = self._create_cell_of_file(
+                parsed_cell.key_type, parsed_cell.key, self.TYPE_FILE,
+                self._get_content_of_cell(parsed_cell))
+        else:
+            cell = self._create_cell_of_data(parsed_cell.key_type,
+                                             parsed_cell.key,
+                                             parsed_cell.value_type,
+                                             parsed_cell.value)
+        return self._set_expiration_of_cell(cell, parsed_cell.expires_at)
+
+    def _put_cell(self, cell):
+        is_in_storage = self._find_position_of_link(
+            self._parse_cell(cell).key)
+        if is_in_storage[0]:
+            self._replace_cell(is_in_storage[1], cell)
+        else:
+            self._add_data(cell)
+
+    def _record_changes(self, changes):
+        path_to_changes = self._data_file_name + self.CHANGES_SUFFIX
+        if not self._is_file_existing(path_to_changes):
+            return
+        records = bytearray()
+        for operation, generation, cell in changes:
+            payload = b''
+            if operation == self.CHANGE_PUT:
+                payload = self._set_generation_of_cell(
+                    self._recreate_cell(self._parse_cell(cell)), generation)
+            elif operation == self.CHANGE_ERASE:
+                parsed_cell = self._parse_cell(cell)
+                payload = self._pack_key(parsed_cell.key_type,
+                                         parsed_cell.key)
+            elif operation == self.CHANGE_EXPIRE:
+                payload = cell
+            records += struct.pack(
+                self.CHANGE_RECORD_FORMAT,
+                struct.calcsize(self.CHANGE_RECORD_FORMAT) + len(payload),
+                generation, operation)
+            records += payload
+        with open(path_to_changes, 'ab') as changes_file:
+            changes_file.write(records)
+
+    def _open_changes(self, path_to_changes):
+        if not self._is_file_existing(path_to_changes):
+            raise FileFailureError(path_to_changes)
+        changes_file = open(path_to_changes, 'rb')
+        if (changes_file.read(len(self.CHANGES_SIGNATURE)) !=
+                self.CHANGES_SIGNATURE):
+            changes_file.close()
+            raise InvalidChangeStreamError(path_to_changes)
+        return changes_file
+
+    def _iter_changes(self, changes_file, path_to_changes):
+        header_len = struct.calcsize(self.CHANGE_RECORD_FORMAT)
+        position = max(self._get_applied_position(),
+                       len(self.CHANGES_SIGNATURE))
+        changes_file.seek(position)
+        while True:
+            header = changes_file.read(header_len)
+            if len(header) < header_len:
+                return
+            record_len, generation, operation = struct.unpack(
+                self.CHANGE_RECORD_FORMAT, header)
+            if record_len < header_len:
+                raise InvalidChangeStreamError(path_to_changes)
+            payload = changes_file.read(record_len - header_len)
+            if len(payload) < record_len - header_len:
+                return
+            position += record_len
+            yield position, operation, generation, payload
+
+    def _apply_put_changes(self, changes):
+        new_cells = {}
+        for generation, cell in changes:
+            key = self._parse_cell(cell).key
+            is_in_storage = self._find_position_of_link(key)
+            if is_in_storage[0]:
+                self._set_generation(generation - 1)
+                self._replace_cell(is_in_storage[1], cell)
+            else:
+                new_cells[key] = cell
+        if len(new_cells) != 0:
+            self._insert_cells(enumerate(new_cells.values()),
+                               lambda cell: cell, keep_generations=True,
+                               reject_errors=True)
+        self._set_generation(changes[-1][0])
+
+    def _apply_change(self, operation, generation, payload, path_to_changes):
+        self._set_generation(generation - 1)
+        if operation == self.CHANGE_ERASE:
+            is_in_storage = self._find_position_of_link(
+                self._parse_key(payload, 0)[3])
+            if is_in_storage[0]:
+                self._erase_by_position_of_link(is_in_storage[1])
+        elif operation == self.CHANGE_CLEAR:
+            self.clear()
+        elif operation == self.CHANGE_EXPIRE:
+            if len(payload) != 8:
+                raise InvalidChangeStreamError(path_to_changes)
+            self._expire(struct.unpack('>q', payload)[0])
+        else:
+            raise InvalidChangeStreamError(path_to_changes)
+        self._set_generation(generation)
+
+    def _get_applied_position(self):
+        path_to_position = self._data_file_name + self.APPLIED_POSITION_SUFFIX
+        if not self._is_file_existing(path_to_position):
+            return 0
+        with open(path_to_position, 'rb') as position_file:
+            return struct.unpack('>q', position_file.read(8))[0]
+
+    def _set_applied_position(self, position):
+        path_to_position = self._data_file_name + self.APPLIED_POSITION_SUFFIX
+        with open(path_to_position + '.tmp', 'wb') as position_file:
+            position_file.write(struct.pack('>q', position))
+        os.replace(path_to_position + '.tmp', path_to_position)
+
+    def _replace_cell(self, link_position, cell, blob=b''):
+        cell_len = len(cell)
+        self._data_file.seek(link_position)
+        link = struct.unpack('>l', self._data_file.read(4))[0]
+        self._data_file.seek(link)
+        capacity = struct.unpack('>l', self._data_file.read(4))[0]
+        self._data_file.seek(0)
+        blob_link = struct.unpack('>l', self._data_file.read(4))[0]
+        free_place = blob_link + len(blob)
+        if cell_len > capacity:
+            link = free_place
+            if link + cell_len > self.GENERATION_POSITION:
+                raise LackOfMemoryError(self._data_file_name)
+            capacity = self._get_capacity_of_cell(cell_len, link)
+            free_place = link + capacity
+        elif free_place > self.GENERATION_POSITION:
+            raise LackOfMemoryError(self._data_file_name)
+        self._write_blob(blob_link, blob)
+        self._data_file.seek(0)
+        self._data_file.write(struct.pack('>l', free_place)[0:4])
+        self._data_file.seek(link_position)
+        self._data_file.write(struct.pack('>l', link)[0:4])
+        generation = self._increase_generation()
+        cell = self._set_generation_of_cell(cell, generation)
+        self._data_file.seek(link)
+        self._data_file.write(self._pad_cell(cell, capacity))
+        tree_ind = (link_position - self.LINKS_START) // 4
+        self._update_checksum_of_tree_height(
+            self._calc_tree_ind_height(tree_ind))
+        self._record_changes([(self.CHANGE_PUT, generation, cell)])
+
+    def _create_cell_of_file_content(self, type_of_key, key, content,
+                                     dedup=None):
+        if dedup is None:
+            dedup = self._dedup
+        if not dedup:
+            return self._create_cell_of_file(type_of_key, key,
+                                             self.TYPE_FILE, content), b''
+        import hashlib
+        content_hash = hashlib.sha256(content).digest()
+        blob_link = self._find_blob(content_hash)
+        blob = b''
+        if blob_link is None:
+            self._data_file.seek(0)
+            blob_link = struct.unpack('>l', self._data_file.read(4))[0]
+            blob = struct.pack(
+                self.BLOB_HEADER_FORMAT,
+                struct.calcsize(self.BLOB_HEADER_FORMAT) + len(content),
+                self.BLOB_SIGNATURE, content_hash) + content
+        return self._create_cell_of_file(
+            type_of_key, key, self.TYPE_BLOB,
+            struct.pack('>l32s', blob_link, content_hash)), blob
+
+    def _get_content_of_cell(self, parsed_cell):
+        if parsed_cell.value_type != self.TYPE_BLOB:
+            return parsed_cell.value
+        blob_link = struct.unpack('>l', parsed_cell.value[0:4])[0]
+        return self._read_blob(blob_link)
+
+    def _find_blob(self, content_hash):
+        blob_link = self._read_blob_index().get(content_hash)
+        if (blob_link is not None and
+                not self._is_blob_of_hash(blob_link, content_hash)):
+            blob_link = self._build_blob_index().get(content_hash)
+        return blob_link
+
+    def _is_blob_of_hash(self, blob_link, content_hash):
+        self._data_file.seek(0)
+        free_place = struct.unpack('>l', self._data_file.read(4))[0]
+        header_len = struct.calcsize(self.BLOB_HEADER_FORMAT)
+        if not (self.CHECKSUMS_AND_DATA_BOUNDARY <= blob_link <=
+                free_place - header_len):
+            return False
+        self._data_file.seek(blob_link)
+        _, signature, blob_hash = struct.unpack(
+            self.BLOB_HEADER_FORMAT, self._data_file.read(header_len))
+        return signature == self.BLOB_SIGNATURE and blob_hash == content_hash
+
+    def _read_blob_index(self):
+        path_to_blob_index = self._data_file_name + self.BLOB_INDEX_SUFFIX
+        if not self._is_file_existing(path_to_blob_index):
+            return self._build_blob_index()
+        header_len = len(self.BLOB_INDEX_SIGNATURE) + 4
+        record_len = struct.calcsize(self.BLOB_INDEX_RECORD_FORMAT)
+        with open(path_to_blob_index, 'rb') as blob_index_file:
+            header = blob_index_file.read(header_len)
+            records = blob_index_file.read()
+        if (len(header) != header_len or len(records) % record_len != 0 or
+                header != self.BLOB_INDEX_SIGNATURE +
+                struct.pack('>l', self._get_generation())):
+            return self._build_blob_index()
+        return {content_hash: blob_link for blob_link, content_hash in
+                struct.iter_unpack(self.BLOB_INDEX_RECORD_FORMAT, records)}
+
+    def _build_blob_index(self):
+        blob_index = {}
+        for link in self._read_links():
+            if link == 0:
+                continue
+            parsed_cell = self._parse_cell(self._read_cell(link))
+            if parsed_cell.value_type == self.TYPE_BLOB:
+                blob_link, content_hash = struct.unpack('>l32s',
+                                                        parsed_cell.value)
+                blob_index[content_hash] = blob_link
+        with open(self._data_file_name + self.BLOB_INDEX_SUFFIX,
+                  'wb') as blob_index_file:
+            blob_index_file.write(self.BLOB_INDEX_SIGNATURE +
+                                  struct.pack('>l', self._get_generation()))
+            for content_hash, blob_link in blob_index.items():
+                blob_index_file.write(struct.pack(
+                    self.BLOB_INDEX_RECORD_FORMAT, blob_link, content_hash))
+        return blob_index
+
+    def _drop_blob_index(self):
+        path_to_blob_index = self._data_file_name + self.BLOB_INDEX_SUFFIX
+        if self._is_file_existing(path_to_blob_index):
+            os.remove(path_to_blob_index)
+
+    def _write_blob(self, blob_link, blob):
+        if len(blob) == 0:
+            return
+        self._data_file.seek(blob_link)
+        self._data_file.write(blob)
+        path_to_blob_index = self._data_file_name + self.BLOB_INDEX_SUFFIX
+        if self._is_file_existing(path_to_blob_index):
+            content_hash = struct.unpack(self.BLOB_HEADER_FORMAT, blob[
+                :struct.calcsize(self.BLOB_HEADER_FORMAT)])[2]
+            with open(path_to_blob_index, 'ab') as blob_index_file:
+                blob_index_file.write(struct.pack(
+                    self.BLOB_INDEX_RECORD_FORMAT, blob_link, content_hash))
+
+    def _read_blob(self, blob_link):
+        import hashlib
+
+        header_len = struct.calcsize(self.BLOB_HEADER_FORMAT)
+        self._data_file.seek(blob_link)
+        blob_len, signature, content_hash = struct.unpack(
+            self.BLOB_HEADER_FORMAT, self._data_file.read(header_len))
+        if signature != self.BLOB_SIGNATURE:
+            raise NotDataFileError(self._data_file_name)
+        content = self._data_file.read(blob_len - header_len)
+        if hashlib.sha256(content).digest() != content_hash:
+            raise NotDataFileError(self._data_file_name)
+        return content
+
+    def _is_valid_structure(self):
+        try:
+            self._data_file.seek(0)
+            last_link = struct.unpack('>l', self._data_file.read(4))[0]
+            if last_link < self.CHECKSUMS_AND_DATA_BOUNDARY:
+                return False
+            for link in self._read_links():
+                if (link != 0 and
+                    link != self.ERASED_ELEMENT_NUMBER and
+                    (link < self.CHECKSUMS_AND_DATA_BOUNDARY or
+                     link >= self.FULL_CAPACITY)):
+                    return False
+            for i in range(self.MAX_TREE_HEIGHT + 1):
+                if self._is_checksum_changed(i):
+                    return False
+        except Exception:
+            return False
+        return True
+
+    def _check_blobs(self):
+        checked_blob_links = set()
+        for link in self._read_links():
+            if link == 0:
+                continue
+            parsed_cell = self._parse_cell(self._read_cell(link))
+            if parsed_cell.value_type != self.TYPE_BLOB:
+                continue
+            blob_link, content_hash = struct.unpack('>l32s',
+                                                    parsed_cell.value)
+            if blob_link in checked_blob_links:
+                continue
+            self._read_blob(blob_link)
+            if not self._is_blob_of_hash(blob_link, content_hash):
+                raise NotDataFileError(self._data_file_name)
+            checked_blob_links.add(blob_link)
+
+    def _get_capacity_of_cell(self, cell_len, link):
+        if self._allocation == self.ALLOCATION_POW2:
+            capacity = 1 << (cell_len - 1).bit_length()
+        elif self._allocation == self.ALLOCATION_PADDING:
+            capacity = cell_len + int(cell_len * self.CELL_PADDING)
+        else:
+            capacity = cell_len
+        return min(capacity, self.GENERATION_POSITION - link)
+
+    def _pad_cell(self, cell, capacity):
+        return (struct.pack('>l', capacity) + cell[4:] +
+                bytes(capacity - len(cell)))
+
+    def _update_checksum_of_tree_height(self, tree_height):
+        checksum = self._calc_tree_height_checksum(tree_height)
+        self._data_file.seek(self.LINKS_AND_CHECKSUMS_BOUNDARY +
+                             4 * tree_height)
+        self._data_file.write(struct.pack('>l', checksum)[0:4])
+
     def _update_checksums_in_file(self):
-        for i in range(self.MAX_TREE_HEIGHT):
+        for i in range(self.MAX_TREE_HEIGHT + 1):
             cur_checksum = self._calc_tree_height_checksum(i)
             self._data_file.seek(self.LINKS_AND_CHECKSUMS_BOUNDARY + 4 * i)
             self._data_file.write(struct.pack('>l', cur_checksum)[0:4])
@@ -424,10 +1746,10 @@ class KVStorage:
     def _convert_bytes_to_sum_of_integers(self, bytes_str):
         bytes_str = bytes(bytes_str)
         length = len(bytes_str)
-        result_sum = 0
-        for i in range(length // 4):
-            result_sum += struct.unpack('>l', bytes_str[4 * i: 4 * i + 4])[0]
-        remainder = bytes_str[4 * (i + 1):length]
+        count_of_integers = length // 4
+        result_sum = sum(struct.unpack(f'>{count_of_integers}l',
+                                       bytes_str[0:4 * count_of_integers]))
+        remainder = bytes_str[4 * count_of_integers:length]
         for j in range(4 - length % 4):
             remainder += b'0'
         result_sum += struct.unpack('>l', remainder[0:4])[0]
@@ -437,10 +1759,10 @@ class KVStorage:
         st = int(2 ** tree_height - 1)
         fn = int(2 ** (tree_height + 1) - 2)
         checksum = 0
-        for tree_ind in range(st, fn + 1):
-            link_position = self.LINKS_START + 4 * tree_ind
-            self._data_file.seek(link_position)
-            link = struct.unpack('>l', self._data_file.read(4))[0]
+        self._data_file.seek(self.LINKS_START + 4 * st)
+        links = struct.unpack(f'>{fn - st + 1}l',
+                              self._data_file.read(4 * (fn - st + 1)))
+        for link in links:
             if link == 0:
                 continue
             self._data_file.seek(link)
@@ -448,7 +1770,7 @@ class KVStorage:
             self._data_file.seek(link)
             checksum = checksum ^ self._convert_bytes_to_sum_of_integers(
                 self._data_file.read(cell_size))
-        return checksum % 1000000007
+        return checksum % self.CHECKSUM_MODULE
 
     def _is_checksum_changed(self, tree_height):
         self._data_file.seek(self.LINKS_AND_CHECKSUMS_BOUNDARY +
@@ -471,26 +1793,35 @@ class KVStorage:
     def _find_position_of_link_of_key(self, key):
         self._is_it_valid_data_file()
         key_type, key = self._get_type_and_correct_value(key)
+        return self._find_position_of_live_link(key)
+
+    def _find_position_of_live_link(self, key):
+        is_in_storage = self._find_position_of_link(key)
+        if is_in_storage[0] and self._is_expired(is_in_storage[2]):
+            return False, -1, None
+        return is_in_storage
+
+    def _find_position_of_link(self, key):
         cur_tree_ind = 0
         cur_tree_height = 0
         while True:
             if cur_tree_ind > self.MAX_TREE_IND:
-                return False, -1
-            if self._is_checksum_changed(cur_tree_height):
+                return False, -1, None
+            if (not self._is_validated and
+                    self._is_checksum_changed(cur_tree_height)):
                 raise NotDataFileError(self._data_file_name)
             cur_link_position = self.LINKS_START + cur_tree_ind * 4
             self._data_file.seek(cur_link_position, 0)
             cur_link = struct.unpack('>l', self._data_file.read(4))[0]
             if cur_link == 0:
-                return False, -1
+                return False, -1, None
             self._data_file.seek(cur_link, 0)
             cur_cell_size = struct.unpack('>l', self._data_file.read(4))[0]
             self._data_file.seek(cur_link, 0)
-            cur_cell = self._data_file.read(cur_cell_size)
-            cur_key = self._parse_cell(cur_cell).key
-            compare_result = self._compare_keys(key, cur_key)
+            cur_cell = self._parse_cell(self._data_file.read(cur_cell_size))
+            compare_result = self._compare_keys(key, cur_cell.key)
             if compare_result == 0:
-                return True, cur_link_position
+                return True, cur_link_position, cur_cell
             if compare_result == 1:
                 cur_tree_ind = cur_tree_ind * 2 + 1
             else:
@@ -504,7 +1835,8 @@ class KVStorage:
         while True:
             if cur_tree_ind > self.MAX_TREE_IND:
                 raise FullDataFileError(self._data_file_name)
-            if self._is_checksum_changed(cur_tree_height):
+            if (not self._is_validated and
+                    self._is_checksum_changed(cur_tree_height)):
                 raise NotDataFileError(self._data_file_name)
             cur_link_position = self.LINKS_START + 4 * cur_tree_ind
             self._data_file.seek(cur_link_position)
@@ -526,7 +1858,7 @@ class KVStorage:
         free_place = struct.unpack('>l', self._data_file.read(4))[0]
         return link_position, free_place
 
-    def _create_cell_of_data(self, type_of_key, key, type_of_value, value):
+    def _pack_key(self, type_of_key, key):
         if type_of_key == 'string':
             key = key.encode()
             key_to_pack = (
@@ -534,6 +1866,12 @@ class KVStorage:
         else:
             key_to_pack = (
                 struct.pack('>ll', 4, key))
+        type_of_key = type_of_key.encode()
+        return (struct.pack(f'>l{len(type_of_key)}s',
+                            len(type_of_key), type_of_key) +
+                key_to_pack)
+
+    def _create_cell_of_data(self, type_of_key, key, type_of_value, value):
         if type_of_value == 'string':
             value = value.encode()
             value_to_pack = (
@@ -541,71 +1879,58 @@ class KVStorage:
         else:
             value_to_pack = (
                 struct.pack('>ll', 4, value))
-        type_of_value = type_of_value.encode()
-        type_of_key = type_of_key.encode()
-        len_of_cell = (12 +
-                       len(type_of_key) + len(key_to_pack) +
-                       len(type_of_value) + len(value_to_pack))
-        byte_cell = (
-            struct.pack('>l', len_of_cell) +
-            struct.pack(f'>l{len(type_of_key)}s',
-                        len(type_of_key), type_of_key) +
-            key_to_pack +
-            struct.pack(f'>l{len(type_of_value)}s',
-                        len(type_of_value), type_of_value) +
-            value_to_pack)
-        return byte_cell
+        return self._create_cell(type_of_key, key, type_of_value,
+                                 value_to_pack)
 
     def _create_cell_of_file(self, type_of_key, key, type_of_value, value):
-        if type_of_key == 'string':
-            key = key.encode()
-            key_to_pack = (
-                struct.pack(f'>l{len(key)}s', len(key), key))
-        else:
-            key_to_pack = (
-                struct.pack('>ll', 4, key))
-        type_of_key = type_of_key.encode()
-        type_of_value = type_of_value.encode()
         value_to_pack = struct.pack(
             f'>l{len(value)}s', len(value), value)
-        len_of_cell = (12 + len(type_of_key) + len(key_to_pack) +
-                       len('file') + len(value_to_pack))
+        return self._create_cell(type_of_key, key, type_of_value,
+                                 value_to_pack)
+
+    def _create_cell(self, type_of_key, key, type_of_value, value_to_pack):
+        key_to_pack = self._pack_key(type_of_key, key)
+        type_of_value = type_of_value.encode()
+        metadata = struct.pack(self.CELL_METADATA_FORMAT, 0, 0)
+        len_of_cell = (8 + len(key_to_pack) +
+                       len(type_of_value) + len(value_to_pack) +
+                       len(metadata))
         byte_cell = (
             struct.pack('>l', len_of_cell) +
-            struct.pack(f'>l{len(type_of_key)}s',
-                        len(type_of_key), type_of_key) +
             key_to_pack +
             struct.pack(f'>l{len(type_of_value)}s',
                         len(type_of_value), type_of_value) +
-            value_to_pack)
+            value_to_pack +
+            metadata)
         return byte_cell
 
-    def _add_data(self, cell):
+    def _add_data(self, cell, blob=b''):
         cell_len = len(cell)
         if (cell_len >
                 self.FULL_CAPACITY - self.CHECKSUMS_AND_DATA_BOUNDARY):
             raise BigDataError()
-        link_position, link = self._get_position_of_link_and_link_in_inp(cell)
-        if link + cell_len >= self.FULL_CAPACITY:
+        link_position, blob_link = (
+            self._get_position_of_link_and_link_in_inp(cell))
+        link = blob_link + len(blob)
+        if link + cell_len > self.GENERATION_POSITION:
             raise LackOfMemoryError(self._data_file_name)
+        self._write_blob(blob_link, blob)
         link_in_bytes = struct.pack('>l', link)
+        capacity = self._get_capacity_of_cell(cell_len, link)
+        generation = self._increase_generation()
+        cell = self._set_generation_of_cell(cell, generation)
         self._data_file.seek(link_position)
         self._data_file.write(link_in_bytes[0:4])
         self._data_file.seek(link)
-        self._data_file.write(cell[0:cell_len])
+        self._data_file.write(self._pad_cell(cell, capacity))
         self._data_file.seek(0)
-        self._data_file.write(struct.pack('>l', link + cell_len)[0:4])
+        self._data_file.write(struct.pack('>l', link + capacity)[0:4])
         tree_ind = (link_position - self.LINKS_START) // 4
-        tree_height = self._calc_tree_ind_height(tree_ind)
-        checksum = self._calc_tree_height_checksum(tree_height)
-        self._data_file.seek(self.LINKS_AND_CHECKSUMS_BOUNDARY +
-                             4 * tree_height)
-        self._data_file.write(struct.pack('>l', checksum)[0:4])
+        self._update_checksum_of_tree_height(
+            self._calc_tree_ind_height(tree_ind))
+        self._record_changes([(self.CHANGE_PUT, generation, cell)])
 
-    def _parse_cell(self, cell):
-        cur_ind = 0
-        cell_len = struct.unpack('>l', cell[cur_ind:cur_ind + 4])[0]
-        cur_ind += 4
+    def _parse_key(self, cell, cur_ind):
         key_type_len = struct.unpack('>l', cell[cur_ind:cur_ind + 4])[0]
         cur_ind += 4
         key_type = struct.unpack(
@@ -620,6 +1945,14 @@ class KVStorage:
             key = struct.unpack(
                 f'>{key_len}s', cell[cur_ind:cur_ind + key_len])[0].decode()
         cur_ind += key_len
+        return key_type_len, key_type, key_len, key, cur_ind
+
+    def _parse_cell(self, cell):
+        cur_ind = 0
+        cell_len = struct.unpack('>l', cell[cur_ind:cur_ind + 4])[0]
+        cur_ind += 4
+        key_type_len, key_type, key_len, key, cur_ind = self._parse_key(
+            cell, cur_ind)
 
         value_type_len = struct.unpack('>l', cell[cur_ind:cur_ind + 4])[0]
         cur_ind += 4
@@ -633,37 +1966,53 @@ class KVStorage:
             value = struct.unpack('>l', cell[cur_ind:cur_ind + 4])[0]
         else:
             value = struct.unpack(
-                f'>{value_len}s', cell[cur_ind:cur_ind +
-                                       value_len])[0].decode()
+                f'>{value_len}s', cell[cur_ind:cur_ind + value_len])[0]
+            if value_type == 'string':
+                value = value.decode()
         cur_ind += value_len
+        generation = 0
+        if cur_ind + 4 <= cell_len:
+            generation = struct.unpack('>l', cell[cur_ind:cur_ind + 4])[0]
+            cur_ind += 4
+        expires_at = 0
+        if cur_ind + 8 <= cell_len:
+            expires_at = struct.unpack('>q', cell[cur_ind:cur_ind + 8])[0]
         parsed_cell = Cell(cell_len, key_type_len, key_type,
                            key_len, key,
                            value_type_len, value_type,
-                           value_len, value)
+                           value_len, value, generation, expires_at)
         return parsed_cell
 
     def _is_it_valid_data_file(self):
+        if self._is_validated:
+            return
+        if (self._validated_generation is not None and
+                self._get_generation() == self._validated_generation):
+            self._is_validated = self._lock_depth > 0
+            return
         if not self._is_file_existing(self._data_file_name):
             raise FileFailureError(self._data_file_name)
-        if not self.check_validity_of_file():
+        if not self._is_valid_structure():
             raise NotDataFileError(self._data_file_name)
+        self._is_validated = self._lock_depth > 0
+        self._validated_generation = self._get_generation()
 
     def _read_file(self, file):
         with open(file, "rb") as f:
             return f.read()
 
     def _get_type_and_correct_value(self, string):
-        result_tuple = namedtuple('result', ['type', 'correct_value'])
         try:
-            return result_tuple('int', int(string))
+            return TypeAndValue('int', int(string))
         except ValueError:
             pass
-        reg = re.compile(r'(\'+)\d+\1')
-        match = reg.fullmatch(string)
-        if match is not None:
-            return result_tuple('string', string[1:-1])
-        reg = re.compile(r'(\"+)\d+\1')
-        match = reg.fullmatch(string)
-        if match is not None:
-            return result_tuple('string', string[1:-1])
-        return result_tuple('string', string)
+        for reg in self.QUOTED_INTEGER_PATTERNS:
+            match = reg.fullmatch(string)
+            if match is not None:
+                return TypeAndValue('string', string[1:-1])
+        return TypeAndValue('string', string)
+
+
+def _verify_part_of_links(data_file_name, st, fn, free_place):
+    with KVStorage(data_file_name, mode=KVStorage.MODE_READ) as kv:
+        return kv._verify_links(st, fn, free_place)
@@ -1,11 +1,17 @@
 #!/usr/bin/env python3
 
 import sys
+import os
 from kv_storage_commands import (KVStorage, NotDataFileError,
                                  DataFileExistenceError, FileFailureError,
                                  UsedKeyError, FullDataFileError,
                                  LackOfMemoryError, BigDataError,
-                                 NoSuchKeyError, InvalidCsvFileError)
+                                 NoSuchKeyError, InvalidCsvFileError,
+                                 InvalidBackupFileError, NotIntegerValueError,
+                                 IntegerOverflowError,
+                                 InvalidChangeStreamError,
+                                 ReadOnlyStorageError, RejectedItemsError,
+                                 IncompatibleBackupError)
 
 import argparse
 
@@ -21,8 +27,24 @@ class Interface:
         LackOfMemoryError: 6,
         BigDataError: 7,
         NoSuchKeyError: 8,
-        InvalidCsvFileError: 9
+        InvalidCsvFileError: 9,
+        InvalidBackupFileError: 10,
+        NotIntegerValueError: 11,
+        IntegerOverflowError: 12,
+        InvalidChangeStreamError: 13,
+        ReadOnlyStorageError: 14,
+        RejectedItemsError: 15,
+        IncompatibleBackupError: 16
     }
+    PARSE_ERROR_CODE = 100
+    BATCH_CHUNK_SIZE = 65536
+    COMMAND_NAMES = ['add', 'add_file', 'get', 'get_file', 'contains',
+                     'erase', 'init', 'clear', 'change',
+                     'check_validity_of_file', 'stats', 'verify', 'batch',
+                     'add_package', 'get_all_keys', 'incr', 'cas', 'export',
+                     'import', 'snapshot', 'backup', 'restore', 'replicate',
+                     'follow', 'expire']
+    COMMAND_ALIASES = {'cvf': 'check_validity_of_file'}
     EXECUTOR = {}
     MESSAGE_TO_USER = {}
     PARSER = None
@@ -31,6 +53,50 @@ class Interface:
         self.EXECUTOR[name] = func_in_KV
         self.MESSAGE_TO_USER[name] = print_message_func
 
+    def _print_verification_report(self, args):
+        report = args.result
+        print(f'{report.count_of_cells} items were checked')
+        if report.is_header_corrupted:
+            print('Header of data file is corrupted')
+        for cell in report.corrupted_cells:
+            print(f'Tree slot {cell.tree_ind} (link {cell.link}): '
+                  f'{cell.problem}')
+        for tree_height in report.corrupted_tree_heights:
+            print(f'Checksum of tree level {tree_height} is wrong')
+        if (not report.is_header_corrupted and
+                len(report.corrupted_cells) == 0 and
+                len(report.corrupted_tree_heights) == 0):
+            print('Data file isn\'t corrupted')
+        if report.count_of_restored_cells is not None:
+            print(f'{report.count_of_restored_cells} readable items were '
+                  f'stored in {args.path_to_repaired_file}')
+
+    def _follow(self, kv, path_to_primary, interval):
+        count_of_changes = kv.follow(path_to_primary)
+        if interval is None:
+            return count_of_changes
+        import time
+
+        try:
+            while True:
+                if count_of_changes != 0:
+                    print(f'{count_of_changes} changes were applied',
+                          flush=True)
+                time.sleep(interval)
+                count_of_changes = kv.follow(path_to_primary)
+        except KeyboardInterrupt:
+            return count_of_changes
+
+    def _import_items(self, kv, path_to_input_file, file_format):
+        rejected_rows = []
+        count_of_items = kv.import_items(
+            path_to_input_file, file_format,
+            lambda row_ind, item: rejected_rows.append(row_ind))
+        if rejected_rows:
+            raise RejectedItemsError(path_to_input_file, count_of_items,
+                                     len(rejected_rows))
+        return count_of_items
+
     def _init_all_commands(self, kv):
         self._init_command('add', kv.add, lambda args:
                            print('Item was successfully added to KV-Storage'))
@@ -63,19 +129,69 @@ class Interface:
                            lambda args:
                            print(f'It is data file') if args.result else
                            print(f'It is not data file'))
+        self._init_command('stats', kv.stats, lambda args:
+                           print('\n'.join([f'{name}: {value}' for name, value
+                                            in args.result.items()])))
+        self._init_command('verify', kv.verify,
+                           self._print_verification_report)
         self._init_command('add_package', kv.add_package, lambda args:
                            print(f'All correct queries were executed'))
         self._init_command('get_all_keys', kv.get_all_keys,
                            lambda args:
                            print("\n".join([str(x) for x in args.result])))
+        self._init_command('incr', kv.incr, lambda args:
+                           print(args.result))
+        self._init_command('cas', kv.cas, lambda args:
+                           print(f'Value of item with the key \'{args.key}\''
+                                 f' was successfully changed')
+                           if args.result else
+                           print(f'Value of item with the key \'{args.key}\''
+                                 f' differs from expected value,'
+                                 f' it wasn\'t changed'))
+        self._init_command('export', kv.export_items, lambda args:
+                           print(f'{args.result} items were successfully '
+                                 f'exported to {args.path_to_output_file}'))
+        self._init_command('import', lambda path_to_input_file, file_format:
+                           self._import_items(kv, path_to_input_file,
+                                              file_format),
+                           lambda args:
+                           print(f'{args.result} items were successfully '
+                                 f'imported from {args.path_to_input_file}'))
+        self._init_command('snapshot', kv.snapshot, lambda args:
+                           print(f'Snapshot of data file was successfully '
+                                 f'stored in {args.path_to_snapshot}'))
+        self._init_command('backup', kv.backup, lambda args:
+                           print(f'Backup up to generation {args.result} '
+                                 f'was successfully stored in '
+                                 f'{args.path_to_backup}'))
+        self._init_command('restore', kv.restore, lambda args:
+                           print(f'Data file was successfully restored '
+                                 f'from backup {args.path_to_backup}'))
+        self._init_command('replicate', kv.enable_replication, lambda args:
+                           print(f'Changes of data file are recorded in '
+                                 f'{args.result}'))
+        self._init_command('expire', kv.expire, lambda args:
+                           print(f'{args.result} expired items were '
+                                 f'removed from KV-Storage'))
+        self._init_command('follow', lambda path_to_primary, interval:
+                           self._follow(kv, path_to_primary, interval),
+                           lambda args:
+                           print(f'{args.result} changes were applied'))
 
-    def _get_parser(self):
+    def _get_parser(self, command_name=None):
         parser = argparse.ArgumentParser(
             description='To use KV-Storage '
                         'write one of the '
                         'positional arguments')
         subparsers = parser.add_subparsers()
+        command_name = self.COMMAND_ALIASES.get(command_name, command_name)
+        for name in self.COMMAND_NAMES:
+            if command_name in self.COMMAND_NAMES and name != command_name:
+                continue
+            getattr(self, f'_add_parser_of_{name}')(subparsers)
+        return parser
 
+    def _add_parser_of_add(self, subparsers):
         parser_add = subparsers.add_parser(
             'add',
             help='Command to add element(not file) in KV-Storage',
@@ -87,7 +203,12 @@ class Interface:
             'key', help='key of the element you want to add')
         parser_add.add_argument(
             'value', type=str, help='value of the element you want to add')
+        parser_add.add_argument(
+            '--ttl', type=float, default=None,
+            help='seconds after which the element expires')
+        self._add_argument_of_allocation(parser_add)
 
+    def _add_parser_of_add_file(self, subparsers):
         parser_add_file = subparsers.add_parser(
             'add_file', help='Command to add file in KV-Storage',
             description='Command to add file in KV-Storage')
@@ -99,7 +220,16 @@ class Interface:
         parser_add_file.add_argument(
             'path_to_file', type=str,
             help='path to file which you want to add')
+        parser_add_file.add_argument(
+            '--dedup', action='store_true', default=None,
+            help='store content only once if the same content '
+                 'is already in KV-Storage')
+        parser_add_file.add_argument(
+            '--ttl', type=float, default=None,
+            help='seconds after which the element expires')
+        self._add_argument_of_allocation(parser_add_file)
 
+    def _add_parser_of_get(self, subparsers):
         parser_get = subparsers.add_parser(
             'get', help='Command to get value(not file) by key',
             description='Command to get value(not file) by key')
@@ -109,6 +239,7 @@ class Interface:
         parser_get.add_argument(
             'key', type=str, help='key of the value you want to get')
 
+    def _add_parser_of_get_file(self, subparsers):
         parser_get_file = subparsers.add_parser(
             'get_file',
             help='Command to get the content of file in KV-Storage. '
@@ -126,6 +257,7 @@ class Interface:
             'path_to_output_file', type=str,
             help='path to file in which content will store')
 
+    def _add_parser_of_contains(self, subparsers):
         parser_contains = subparsers.add_parser(
             'contains',
             help='Command to find out if element with'
@@ -138,6 +270,7 @@ class Interface:
         parser_contains.add_argument(
             'key', type=str, help='key which existence interests you')
 
+    def _add_parser_of_erase(self, subparsers):
         parser_erase = subparsers.add_parser(
             'erase',
             help='Command to erase element with such key from KV-Storage',
@@ -149,6 +282,7 @@ class Interface:
         parser_erase.add_argument(
             'key', type=str, help='key of the element you want to erase')
 
+    def _add_parser_of_init(self, subparsers):
         parser_init = subparsers.add_parser(
             'init',
             help='Command to create new KV-Storage file',
@@ -157,6 +291,7 @@ class Interface:
         parser_init.add_argument(
             'data_file', type=str, help='path to file you want to create')
 
+    def _add_parser_of_clear(self, subparsers):
         parser_clear = subparsers.add_parser(
             'clear',
             help='Command to clear the content of data file',
@@ -165,6 +300,7 @@ class Interface:
         parser_clear.add_argument(
             'data_file', type=str, help='data file which you want to clear')
 
+    def _add_parser_of_change(self, subparsers):
         parser_change = subparsers.add_parser(
             'change',
             help='Command to change value of the element with such key',
@@ -179,7 +315,17 @@ class Interface:
             'value_type', choices=['file', 'data'], type=str,
             help='type of new value(file or data)')
         parser_change.add_argument('value', type=str, help='new value')
+        parser_change.add_argument(
+            '--dedup', action='store_true', default=None,
+            help='store content of file only once if the same content '
+                 'is already in KV-Storage')
+        parser_change.add_argument(
+            '--ttl', type=float, default=None,
+            help='seconds after which the element expires, '
+                 'by default expiration time is kept')
+        self._add_argument_of_allocation(parser_change)
 
+    def _add_parser_of_check_validity_of_file(self, subparsers):
         parser_cvf = subparsers.add_parser(
             'check_validity_of_file', aliases=['cvf'],
             help='Command to check if specified file is a KV-Storage '
@@ -190,6 +336,59 @@ class Interface:
         parser_cvf.add_argument(
             'data_file', type=str, help='file which you want to inspect')
 
+    def _add_parser_of_stats(self, subparsers):
+        parser_stats = subparsers.add_parser(
+            'stats',
+            help='Command to get statistics of KV-Storage',
+            description='Command to get statistics of KV-Storage')
+        parser_stats.set_defaults(command_name='stats', result=None)
+        parser_stats.add_argument(
+            'data_file', type=str, help='data file you want to work with')
+        parser_stats.add_argument(
+            '--primary', type=str, default=None, dest='path_to_primary',
+            help='primary data file which data file follows, '
+                 'lag of data file behind it is shown')
+
+    def _add_parser_of_verify(self, subparsers):
+        parser_verify = subparsers.add_parser(
+            'verify',
+            help='Command to find corrupted items of data file and '
+                 'optionally store all readable items in new data file',
+            description='Command to find corrupted items of data file and '
+                        'optionally store all readable items in new data '
+                        'file')
+        parser_verify.set_defaults(command_name='verify', result=None)
+        parser_verify.add_argument(
+            'data_file', type=str, help='file which you want to inspect')
+        parser_verify.add_argument(
+            '--repair', type=str, default=None,
+            dest='path_to_repaired_file',
+            help='path to new data file for all readable items')
+        parser_verify.add_argument(
+            '-j', type=int, default=None, dest='jobs',
+            help='number of processes (number of CPUs by default)')
+        self._add_argument_of_allocation(parser_verify)
+
+    def _add_parser_of_batch(self, subparsers):
+        parser_batch = subparsers.add_parser(
+            'batch',
+            help='Command to execute many commands with one data file. '
+                 'Commands are read line by line, data file is omitted '
+                 'in them. For every command one line with exit code and '
+                 'output is written',
+            description='Command to execute many commands with one data '
+                        'file. Commands are read line by line, data file '
+                        'is omitted in them. For every command one line '
+                        'with exit code and output is written')
+        parser_batch.set_defaults(command_name='batch', result=None)
+        parser_batch.add_argument(
+            'data_file', type=str, help='data file you want to work with')
+        parser_batch.add_argument(
+            '-f', type=str, default=None, dest='commands_file',
+            help='if you want to read commands from file')
+        self._add_argument_of_allocation(parser_batch)
+
+    def _add_parser_of_add_package(self, subparsers):
         parser_add_package = subparsers.add_parser(
             'add_package',
             help='Command to add package of items to KV-Storage',
@@ -201,7 +400,9 @@ class Interface:
         parser_add_package.add_argument(
             '-f', type=str, help='if you want to read queries from csv file',
             nargs='?', default=-1, dest='csv_file')
+        self._add_argument_of_allocation(parser_add_package)
 
+    def _add_parser_of_get_all_keys(self, subparsers):
         parser_get_all_keys = subparsers.add_parser(
             'get_all_keys',
             help='Command to get list of all keys in KV-Storage',
@@ -210,41 +411,292 @@ class Interface:
                                          result=None)
         parser_get_all_keys.add_argument(
             'data_file', type=str, help='data file you want to work with')
-        return parser
 
+    def _add_parser_of_incr(self, subparsers):
+        parser_incr = subparsers.add_parser(
+            'incr',
+            help='Command to increase integer value of the element with '
+                 'such key and get new value',
+            description='Command to increase integer value of the element '
+                        'with such key and get new value')
+        parser_incr.set_defaults(command_name='incr', result=None)
+        parser_incr.add_argument(
+            'data_file', type=str, help='data file you want to work with')
+        parser_incr.add_argument(
+            'key', type=str, help='key of the element you want to increase')
+        parser_incr.add_argument(
+            'delta', type=int, nargs='?', default=1,
+            help='number which will be added to value (1 by default)')
+
+    def _add_parser_of_cas(self, subparsers):
+        parser_cas = subparsers.add_parser(
+            'cas',
+            help='Command to change value of the element with such key '
+                 'only if it is equal to expected value',
+            description='Command to change value of the element with such '
+                        'key only if it is equal to expected value')
+        parser_cas.set_defaults(command_name='cas', result=None)
+        parser_cas.add_argument(
+            'data_file', type=str, help='data file you want to work with')
+        parser_cas.add_argument(
+            'key', type=str, help='key of the element you want to change')
+        parser_cas.add_argument(
+            'expected_value', type=str, help='expected value of the element')
+        parser_cas.add_argument('new_value', type=str, help='new value')
+
+    def _add_parser_of_export(self, subparsers):
+        parser_export = subparsers.add_parser(
+            'export',
+            help='Command to write all items of KV-Storage in key order '
+                 'to jsonl or csv file',
+            description='Command to write all items of KV-Storage in key '
+                        'order to jsonl or csv file. Content of files is '
+                        'encoded in base64')
+        parser_export.set_defaults(command_name='export', result=None)
+        parser_export.add_argument(
+            'data_file', type=str, help='data file you want to work with')
+        parser_export.add_argument(
+            'path_to_output_file', type=str,
+            help='path to file in which items will store')
+        parser_export.add_argument(
+            '--format', choices=['jsonl', 'csv'], default=None,
+            dest='file_format',
+            help='format of output file (by default csv for *.csv files '
+                 'and jsonl for others)')
+
+    def _add_parser_of_import(self, subparsers):
+        parser_import = subparsers.add_parser(
+            'import',
+            help='Command to add all items from jsonl or csv file '
+                 'made by export to KV-Storage',
+            description='Command to add all items from jsonl or csv file '
+                        'made by export to KV-Storage')
+        parser_import.set_defaults(command_name='import', result=None)
+        parser_import.add_argument(
+            'data_file', type=str, help='data file you want to work with')
+        parser_import.add_argument(
+            'path_to_input_file', type=str,
+            help='path to file with items')
+        parser_import.add_argument(
+            '--format', choices=['jsonl', 'csv'], default=None,
+            dest='file_format',
+            help='format of input file (by default csv for *.csv files '
+                 'and jsonl for others)')
+        self._add_argument_of_allocation(parser_import)
+
+    def _add_parser_of_snapshot(self, subparsers):
+        parser_snapshot = subparsers.add_parser(
+            'snapshot',
+            help='Command to make consistent copy of KV-Storage',
+            description='Command to make consistent copy of KV-Storage')
+        parser_snapshot.set_defaults(command_name='snapshot', result=None)
+        parser_snapshot.add_argument(
+            'data_file', type=str, help='data file you want to work with')
+        parser_snapshot.add_argument(
+            'path_to_snapshot', type=str,
+            help='path to file in which copy will store')
+
+    def _add_parser_of_backup(self, subparsers):
+        parser_backup = subparsers.add_parser(
+            'backup',
+            help='Command to store items of KV-Storage in backup file. '
+                 'With --since only items added or changed after '
+                 'specified generation are stored',
+            description='Command to store items of KV-Storage in backup '
+                        'file. With --since only items added or changed '
+                        'after specified generation are stored')
+        parser_backup.set_defaults(command_name='backup', result=None)
+        parser_backup.add_argument(
+            'data_file', type=str, help='data file you want to work with')
+        parser_backup.add_argument(
+            'path_to_backup', type=str,
+            help='path to file in which backup will store')
+        parser_backup.add_argument(
+            '--since', type=int, default=None, dest='since_generation',
+            help='generation printed by previous backup')
+
+    def _add_parser_of_restore(self, subparsers):
+        parser_restore = subparsers.add_parser(
+            'restore',
+            help='Command to restore KV-Storage from backup file',
+            description='Command to restore KV-Storage from backup file')
+        parser_restore.set_defaults(command_name='restore', result=None)
+        parser_restore.add_argument(
+            'data_file', type=str, help='data file you want to work with')
+        parser_restore.add_argument(
+            'path_to_backup', type=str, help='path to backup file')
+        self._add_argument_of_allocation(parser_restore)
+
+    def _add_parser_of_replicate(self, subparsers):
+        parser_replicate = subparsers.add_parser(
+            'replicate',
+            help='Command to record all changes of KV-Storage in change '
+                 'stream which followers apply to their data files',
+            description='Command to record all changes of KV-Storage in '
+                        'change stream which followers apply to their '
+                        'data files')
+        parser_replicate.set_defaults(command_name='replicate', result=None)
+        parser_replicate.add_argument(
+            'data_file', type=str, help='data file you want to work with')
+
+    def _add_parser_of_follow(self, subparsers):
+        parser_follow = subparsers.add_parser(
+            'follow',
+            help='Command to apply changes of primary KV-Storage which '
+                 'were not applied yet. With --interval changes are '
+                 'applied until the command is interrupted',
+            description='Command to apply changes of primary KV-Storage '
+                        'which were not applied yet. With --interval '
+                        'changes are applied until the command is '
+                        'interrupted')
+        parser_follow.set_defaults(command_name='follow', result=None)
+        parser_follow.add_argument(
+            'data_file', type=str, help='data file you want to work with')
+        parser_follow.add_argument(
+            'path_to_primary', type=str,
+            help='primary data file which changes are recorded by '
+                 'command replicate')
+        parser_follow.add_argument(
+            '--interval', type=float, default=None,
+            help='seconds between checks of new changes')
+        self._add_argument_of_allocation(parser_follow)
+
+    def _add_parser_of_expire(self, subparsers):
+        parser_expire = subparsers.add_parser(
+            'expire',
+            help='Command to remove all expired items from KV-Storage '
+                 'and free space used by them',
+            description='Command to remove all expired items from '
+                        'KV-Storage and free space used by them')
+        parser_expire.set_defaults(command_name='expire', result=None)
+        parser_expire.add_argument(
+            'data_file', type=str, help='data file you want to work with')
+        self._add_argument_of_allocation(parser_expire)
+
+
+    def _add_argument_of_allocation(self, parser):
+        parser.add_argument(
+            '--allocation', default=None,
+            choices=[KVStorage.ALLOCATION_EXACT, KVStorage.ALLOCATION_PADDING,
+                     KVStorage.ALLOCATION_POW2],
+            help='space reserved for growth of written items: exact '
+                 'reserves nothing, padding reserves a quarter (default), '
+                 'pow2 rounds size up to a power of two')
     def __init__(self):
-        self.PARSER = self._get_parser()
+        self.PARSER = None
 
-    def handle_command(self):
-        args = self.PARSER.parse_args()
-        dict_of_args = vars(args)
+    def _get_full_parser(self):
+        if self.PARSER is None:
+            self.PARSER = self._get_parser()
+        return self.PARSER
+
+    def handle_command(self, argv=None):
+        if argv is None:
+            argv = sys.argv[1:]
+        parser = self._get_parser(argv[0] if len(argv) != 0 else None)
+        args = parser.parse_args(argv)
         if not hasattr(args, 'command_name'):
-            self.PARSER.print_help()
+            parser.print_help()
             return
+        kv = KVStorage(args.data_file,
+                       getattr(args, 'allocation', None) or
+                       KVStorage.ALLOCATION_PADDING)
+        self._init_all_commands(kv)
+        if args.command_name == 'batch':
+            error_level = self._execute_batch(kv, args)
+        else:
+            error_level = self._execute_command(args)
+        kv.close()
+        return error_level
+
+    def _execute_command(self, args):
+        dict_of_args = vars(args)
         command = args.command_name
-        data_file_name = args.data_file
         dict_of_args.pop('command_name', None)
         dict_of_args.pop('result', None)
         dict_of_args.pop('data_file', None)
+        dict_of_args.pop('allocation', None)
         list_of_args = list(dict_of_args.values())
-        kv = KVStorage(data_file_name)
-        self._init_all_commands(kv)
         try:
             if command == 'add_package' and args.csv_file == -1:
                 args.result = self.EXECUTOR[command]()
             else:
                 args.result = self.EXECUTOR[command](*list_of_args)
             self.MESSAGE_TO_USER[command](args)
-            kv.close()
             return 0
         except Exception as e:
-            kv.close()
             print(e, file=sys.stderr)
             t, v, tb = sys.exc_info()
             if t in self.EXIT_CODES.keys():
                 return self.EXIT_CODES[t]
             return 100
 
+    def _execute_batch(self, kv, args):
+        import io
+        from contextlib import redirect_stdout, redirect_stderr
+
+        if (args.commands_file is not None and
+                not os.path.isfile(args.commands_file)):
+            print(FileFailureError(args.commands_file), file=sys.stderr)
+            return self.EXIT_CODES[FileFailureError]
+        commands_file = sys.stdin
+        if args.commands_file is not None:
+            commands_file = open(args.commands_file, 'r')
+        for lines in self._iter_chunks_of_commands(commands_file):
+            results = []
+            with kv.lock():
+                for line in lines:
+                    output = io.StringIO()
+                    with redirect_stdout(output), redirect_stderr(output):
+                        error_level = self._execute_line(line,
+                                                         args.data_file)
+                    if error_level is not None:
+                        results.append((error_level, output.getvalue()))
+            for error_level, output in results:
+                output = output.rstrip('\n').replace('\n', '\\n')
+                print(f'{error_level}\t{output}', flush=True)
+        if commands_file is not sys.stdin:
+            commands_file.close()
+        return 0
+
+    def _iter_chunks_of_commands(self, commands_file):
+        if commands_file is sys.stdin:
+            for line in commands_file:
+                yield [line]
+            return
+        while True:
+            lines = commands_file.readlines(self.BATCH_CHUNK_SIZE)
+            if len(lines) == 0:
+                return
+            yield lines
+
+    def _execute_line(self, line, data_file_name):
+        import shlex
+
+        try:
+            words = shlex.split(line)
+        except ValueError as e:
+            print(e)
+            return self.PARSE_ERROR_CODE
+        if len(words) == 0:
+            return None
+        try:
+            args = self._get_full_parser().parse_args(
+                [words[0], data_file_name] + words[1:])
+        except SystemExit as e:
+            return self.PARSE_ERROR_CODE if e.code else 0
+        if args.command_name == 'batch':
+            print('Command batch can\'t be executed in batch')
+            return self.PARSE_ERROR_CODE
+        if getattr(args, 'allocation', None) is not None:
+            print('Option --allocation can be given only to command batch')
+            return self.PARSE_ERROR_CODE
+        if args.command_name == 'add_package' and args.csv_file in (-1, None):
+            print('Command add_package can\'t read queries from standard '
+                  'input in batch')
+            return self.PARSE_ERROR_CODE
+        return self._execute_command(args)
+
 
 if __name__ == '__main__':
     interface = Interface()